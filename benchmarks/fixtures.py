@@ -0,0 +1,97 @@
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List
+from unittest import mock
+
+import pandas as pd
+
+from pipeline.synthetic import SyntheticConfig, generate_raw_frame
+
+
+@dataclass
+class ServingFixture:
+    """Synthetic processed file and model laid out like DATA_DIR."""
+
+    root: Path
+    processed_path: Path
+    model_path: Path
+    # RT interval starts with a full feature row, for /predict bodies
+    timestamps: List[str]
+
+
+@contextmanager
+def serving_workspace(root: Path) -> Iterator[Path]:
+    """Point ETL, serving and the model path at `root` (in this process)."""
+    import ingestion.etl_pipeline as etl
+    import serving.main as serving_main
+    import serving.model_loader as model_loader
+
+    processed = root / "processed"
+    processed.mkdir(parents=True, exist_ok=True)
+    with ExitStack() as stack:
+        for target, attr, value in [
+            (etl, "PROCESSED_DIR", processed),
+            (serving_main, "PROCESSED_DIR", processed),
+            (serving_main, "_features", None),
+            (serving_main, "_features_key", None),
+            (serving_main, "_startup_error", None),
+            (model_loader, "MODEL_PATH", root / "model.json"),
+            (model_loader, "_model", None),
+        ]:
+            stack.enter_context(mock.patch.object(target, attr, value))
+        yield processed
+
+
+def build_serving_fixture(
+    root: Path,
+    nodes: int = 2,
+    days: int = 9,
+    seed: int = 0,
+    n_estimators: int = 20,
+) -> ServingFixture:
+    """Write a processed file and a small multi-horizon model under `root`.
+
+    The layout matches DATA_DIR (processed/ holds the parquet), so a
+    separate server process can use it via DATA_DIR and MODEL_PATH.
+    """
+    from feature_repo.alignment import align_sources
+    from feature_repo.feature_definitions import build_features
+    from ingestion.etl_pipeline import process_raw_file
+    from training.train_xgb import (
+        DEFAULT_HORIZONS,
+        add_targets,
+        fit_model,
+        get_feature_columns,
+        get_params,
+        load_processed_data,
+        split_xy,
+    )
+
+    root = Path(root)
+    with serving_workspace(root):
+        raw_path = root / "pjm_raw_loadtest.parquet"
+        generate_raw_frame(SyntheticConfig(nodes=nodes, days=days, seed=seed)).to_parquet(
+            raw_path, index=False
+        )
+        processed_path = process_raw_file(raw_path)
+
+    feats = build_features(align_sources(load_processed_data(files=[processed_path])))
+    horizons = list(DEFAULT_HORIZONS)
+    train_df, targets = add_targets(feats, horizons)
+    features = get_feature_columns(train_df)
+    X_train, y_train, X_test, y_test = split_xy(train_df, features, targets)
+    params = get_params(test_run=True, multi_output=True)
+    params["n_estimators"] = n_estimators
+    model = fit_model(X_train, y_train, X_test, y_test, params)
+    model.get_booster().set_attr(horizons=",".join(horizons))
+    model_path = root / "model.json"
+    model.save_model(model_path)
+
+    timestamps = pd.Series(feats["interval_start_utc"].unique())
+    return ServingFixture(
+        root=root,
+        processed_path=processed_path,
+        model_path=model_path,
+        timestamps=[ts.isoformat() for ts in timestamps],
+    )
@@ -0,0 +1,439 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from benchmarks.fixtures import build_serving_fixture, serving_workspace
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Endpoint:
+    method: str
+    path: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def parse_endpoint(value: str) -> Endpoint:
+    """`POST:/predict` or `/predict` (POST)."""
+    method, _, path = value.rpartition(":")
+    if not path.startswith("/"):
+        raise ValueError(f"Endpoint path must start with '/': {value}")
+    return Endpoint((method or "POST").upper(), path)
+
+
+@dataclass
+class RequestRecord:
+    endpoint: str
+    status: str
+    ok: bool
+    latency: float
+
+
+class ResourceSampler:
+    """Sample CPU% and RSS of a process and its children in a thread.
+
+    CPU% is summed over processes, so N busy workers can exceed 100.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        import psutil
+
+        self._psutil = psutil
+        self.root = psutil.Process(pid)
+        self.interval = interval
+        self._procs: Dict[int, "psutil.Process"] = {}
+        self._cpu: List[float] = []
+        self._rss: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _processes(self):
+        procs = [self.root] + self.root.children(recursive=True)
+        for proc in procs:
+            if proc.pid not in self._procs:
+                proc.cpu_percent(None)  # first call only primes the counter
+                self._procs[proc.pid] = proc
+        return [self._procs[p.pid] for p in procs]
+
+    def _sample(self) -> None:
+        cpu = rss = 0.0
+        for proc in self._processes():
+            try:
+                cpu += proc.cpu_percent(None)
+                rss += proc.memory_info().rss
+            except self._psutil.NoSuchProcess:
+                continue
+        self._cpu.append(cpu)
+        self._rss.append(rss / (1024 * 1024))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "ResourceSampler":
+        self._processes()
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+        if not self._cpu:
+            self._sample()
+        return {
+            "pid": self.root.pid,
+            "samples": len(self._cpu),
+            "cpu_percent_mean": float(np.mean(self._cpu)),
+            "cpu_percent_max": float(np.max(self._cpu)),
+            "rss_mb_mean": float(np.mean(self._rss)),
+            "rss_mb_max": float(np.max(self._rss)),
+        }
+
+
+def _body(endpoint: Endpoint, timestamps: List[str], rng: random.Random) -> Optional[dict]:
+    if endpoint.method == "GET":
+        return None
+    # A quarter of /predict calls ask for the latest row, the rest for a
+    # random historical interval (exercising the timestamp lookup).
+    if endpoint.path.endswith("/predict") and timestamps and rng.random() >= 0.25:
+        return {"timestamp_utc": rng.choice(timestamps)}
+    return {}
+
+
+async def run_load(
+    client,
+    endpoints: List[Endpoint],
+    timestamps: List[str],
+    concurrency: int = 8,
+    rate: float | None = None,
+    duration: float | None = 10.0,
+    requests: int | None = None,
+    seed: int = 0,
+) -> tuple[List[RequestRecord], float]:
+    """Send requests from `concurrency` workers until `duration` or `requests`.
+
+    Without `rate` each worker sends back-to-back (closed loop). With
+    `rate`, request i is due at start + i / rate and its latency is
+    measured from that due time, so queueing behind a slow server counts
+    against latency instead of silently lowering the offered load.
+    """
+    import httpx
+
+    if not duration and not requests:
+        raise ValueError("Set a duration or a number of requests")
+    rng = random.Random(seed)
+    counter = itertools.count()
+    records: List[RequestRecord] = []
+    start = time.perf_counter()
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if requests and i >= requests:
+                return
+            if rate:
+                due = start + i / rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                t0 = due
+            else:
+                t0 = time.perf_counter()
+            if duration and t0 - start >= duration:
+                return
+
+            endpoint = endpoints[i % len(endpoints)]
+            body = _body(endpoint, timestamps, rng)
+            try:
+                resp = await client.request(endpoint.method, endpoint.path, json=body)
+                status, ok = str(resp.status_code), resp.status_code < 400
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            records.append(RequestRecord(endpoint.label, status, ok, time.perf_counter() - t0))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return records, time.perf_counter() - start
+
+
+def _latency_ms(latencies: List[float]) -> dict:
+    if not latencies:
+        return {}
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "mean": float(ms.mean()),
+        "max": float(ms.max()),
+    }
+
+
+def summarize(records: List[RequestRecord], elapsed: float) -> dict:
+    total = len(records)
+    errors = sum(not r.ok for r in records)
+    status_counts: Dict[str, int] = {}
+    for r in records:
+        status_counts[r.status] = status_counts.get(r.status, 0) + 1
+
+    per_endpoint = {}
+    for label in sorted({r.endpoint for r in records}):
+        rows = [r for r in records if r.endpoint == label]
+        per_endpoint[label] = {
+            "requests": len(rows),
+            "errors": sum(not r.ok for r in rows),
+            "latency_ms": _latency_ms([r.latency for r in rows]),
+        }
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "seconds": elapsed,
+        "throughput_rps": total / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": _latency_ms([r.latency for r in records]),
+        "status_counts": dict(sorted(status_counts.items())),
+        "endpoints": per_endpoint,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(base_url: str, proc: subprocess.Popen | None, timeout: float) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    last = "no response"
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f"Server exited with code {proc.returncode} before becoming ready")
+        try:
+            resp = httpx.get(f"{base_url}/ready", timeout=2.0)
+            if resp.status_code == 200:
+                return
+            last = resp.text
+        except httpx.HTTPError as e:
+            last = str(e)
+        time.sleep(0.2)
+    raise SystemExit(f"Server at {base_url} not ready after {timeout}s: {last}")
+
+
+@contextmanager
+def uvicorn_server(fixture_root: Path, model_path: Path, workers: int = 1, timeout: float = 120.0) -> Iterator[tuple]:
+    """Run `uvicorn serving.main:app` on a free local port against the fixture."""
+    port = _free_port()
+    env = dict(os.environ, DATA_DIR=str(fixture_root), MODEL_PATH=str(model_path), USE_S3="0")
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "serving.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base_url, proc, timeout)
+        yield base_url, proc.pid
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def run_loadtest(
+    target: str = "inprocess",
+    endpoints: List[Endpoint] | None = None,
+    concurrency: int = 8,
+    rate: float | None = None,
+    duration: float | None = 10.0,
+    requests: int | None = None,
+    url: str | None = None,
+    server_pid: int | None = None,
+    workers: int = 1,
+    nodes: int = 2,
+    days: int = 9,
+    seed: int = 0,
+) -> dict:
+    import httpx
+
+    endpoints = endpoints or [Endpoint("POST", "/predict")]
+    config = {
+        "target": target,
+        "endpoints": [e.label for e in endpoints],
+        "concurrency": concurrency,
+        "rate": rate,
+        "duration": duration,
+        "requests": requests,
+        "workers": workers if target == "uvicorn" else None,
+        "fixture": None if target == "url" else {"nodes": nodes, "days": days, "seed": seed},
+    }
+
+    async def drive(client, timestamps, pid):
+        sampler = ResourceSampler(pid).start() if pid else None
+        try:
+            records, elapsed = await run_load(
+                client, endpoints, timestamps, concurrency, rate, duration, requests, seed
+            )
+        finally:
+            server = sampler.stop() if sampler else None
+        return records, elapsed, server
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    with ExitStack() as stack:
+        if target == "url":
+            if not url:
+                raise SystemExit("--url is required with --target url")
+            base_url, pid, timestamps = url.rstrip("/"), server_pid, []
+            transport = None
+        else:
+            tmp = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="pjm-loadtest-")))
+            print(f"Building synthetic fixture ({nodes} nodes x {days} days) in {tmp}")
+            fixture = build_serving_fixture(tmp, nodes=nodes, days=days, seed=seed)
+            timestamps = fixture.timestamps
+            if target == "inprocess":
+                import serving.main as serving_main
+
+                stack.enter_context(serving_workspace(tmp))
+                # ASGITransport does not run the lifespan hook
+                serving_main.warm_up()
+                if serving_main._startup_error:
+                    raise SystemExit(f"Warm-up failed: {serving_main._startup_error}")
+                base_url, pid = "http://loadtest", os.getpid()
+                transport = httpx.ASGITransport(app=serving_main.app)
+            elif target == "uvicorn":
+                base_url, pid = stack.enter_context(uvicorn_server(tmp, fixture.model_path, workers))
+                transport = None
+            else:
+                raise SystemExit(f"Unknown target {target}")
+
+        async def main_async():
+            async with httpx.AsyncClient(
+                base_url=base_url, transport=transport, limits=limits, timeout=30.0
+            ) as client:
+                return await drive(client, timestamps, pid)
+
+        records, elapsed, server = asyncio.run(main_async())
+
+    report = summarize(records, elapsed)
+    report["server"] = server
+    report["config"] = config
+    report["created_utc"] = datetime.now(timezone.utc).isoformat()
+    return report
+
+
+def format_report(report: dict) -> str:
+    lat = report["latency_ms"]
+    lines = [
+        f"requests={report['requests']} errors={report['errors']} "
+        f"error_rate={report['error_rate']:.2%} seconds={report['seconds']:.2f}",
+        f"throughput={report['throughput_rps']:.1f} req/s",
+    ]
+    if lat:
+        lines.append(
+            f"latency ms: p50={lat['p50']:.2f} p95={lat['p95']:.2f} "
+            f"p99={lat['p99']:.2f} max={lat['max']:.2f}"
+        )
+    for label, stats in report["endpoints"].items():
+        ep = stats["latency_ms"]
+        lines.append(
+            f"  {label:<24} n={stats['requests']:<7} errors={stats['errors']:<5} "
+            f"p50={ep['p50']:.2f} p95={ep['p95']:.2f} p99={ep['p99']:.2f}"
+        )
+    server = report.get("server")
+    if server:
+        lines.append(
+            f"server pid={server['pid']}: cpu mean={server['cpu_percent_mean']:.0f}% "
+            f"max={server['cpu_percent_max']:.0f}%, rss max={server['rss_mb_max']:.0f}MB"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the serving API")
+    parser.add_argument(
+        "--target",
+        choices=["inprocess", "uvicorn", "url"],
+        default="inprocess",
+        help="In-process ASGI app, a local uvicorn server, or an already running --url",
+    )
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        help="METHOD:PATH to call (repeatable, round-robin); default POST:/predict",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, help="Target requests/second across all workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--url", type=str, help="Base URL for --target url")
+    parser.add_argument("--server-pid", type=int, help="PID to sample CPU/RSS for --target url")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --target uvicorn")
+    parser.add_argument("--nodes", type=int, default=2, help="Nodes in the synthetic fixture")
+    parser.add_argument("--days", type=int, default=9, help="Days in the synthetic fixture")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    try:
+        endpoints = [parse_endpoint(e) for e in (args.endpoint or ["POST:/predict"])]
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1")
+
+    report = run_loadtest(
+        target=args.target,
+        endpoints=endpoints,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        duration=None if args.requests else args.duration,
+        requests=args.requests,
+        url=args.url,
+        server_pid=args.server_pid,
+        workers=args.workers,
+        nodes=args.nodes,
+        days=args.days,
+        seed=args.seed,
+    )
+    print(format_report(report))
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+        print(f"Wrote load test report to {out}")
+
+
+if __name__ == "__main__":
+    main()
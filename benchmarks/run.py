@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fixtures import serving_workspace
+from pipeline.synthetic import SyntheticConfig, generate_raw_frame
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# name -> (nodes, days). Lag features need more than 7 days per node.
+SCALES: Dict[str, Tuple[int, int]] = {
+    "small": (1, 9),
+    "medium": (5, 30),
+    "large": (20, 60),
+}
+
+STAGES = [
+    "process_raw_file",
+    "validate_file",
+    "load_processed_data",
+    "align_sources",
+    "build_features",
+    "train",
+    "serving_warm_up",
+    "predict",
+]
+
+
+def _measure(fn: Callable[[], object], repeat: int, memory: bool) -> Tuple[object, dict]:
+    """Run `fn` `repeat` times for timing, plus once under tracemalloc.
+
+    Peak memory covers allocations visible to tracemalloc (Python objects
+    and numpy buffers), not Arrow's own memory pool.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    stats = {
+        "seconds": statistics.median(times),
+        "seconds_min": min(times),
+        "peak_mb": None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stats["peak_mb"] = peak / (1024 * 1024)
+    return result, stats
+
+
+async def _predict_latencies(app, timestamps: List[str], requests: int) -> List[float]:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(requests):
+            body = {"timestamp_utc": timestamps[i % len(timestamps)]} if i % 2 else {}
+            start = time.perf_counter()
+            resp = await client.post("/predict", json=body)
+            latencies.append(time.perf_counter() - start)
+            resp.raise_for_status()
+    return latencies
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_scale(
+    name: str,
+    nodes: int,
+    days: int,
+    stages: List[str],
+    repeat: int = 3,
+    memory: bool = True,
+    predict_requests: int = 50,
+    seed: int = 0,
+) -> List[dict]:
+    from feature_repo.alignment import align_sources
+    from feature_repo.feature_definitions import build_features
+    from ingestion.etl_pipeline import process_raw_file
+    from ingestion.validate_data import validate_file
+    from training.train_xgb import (
+        DEFAULT_HORIZONS,
+        add_targets,
+        fit_model,
+        get_feature_columns,
+        get_params,
+        load_processed_data,
+        split_xy,
+    )
+
+    results = []
+
+    def record(stage: str, rows: int, stats: dict, **extra) -> None:
+        row = {"scale": name, "stage": stage, "nodes": nodes, "days": days, "rows": rows}
+        row.update(stats)
+        row.update(extra)
+        results.append(row)
+        peak = "" if row["peak_mb"] is None else f" peak={row['peak_mb']:.1f}MB"
+        print(f"[{name}] {stage:<20} rows={rows:<9} {row['seconds']:.4f}s{peak}")
+
+    def wanted(stage: str) -> bool:
+        return stage in stages
+
+    with tempfile.TemporaryDirectory(prefix="pjm-bench-") as tmp, serving_workspace(Path(tmp)):
+        root = Path(tmp)
+        raw_path = root / f"pjm_raw_{name}.parquet"
+        raw = generate_raw_frame(SyntheticConfig(nodes=nodes, days=days, seed=seed))
+        raw.to_parquet(raw_path, index=False)
+
+        processed_path, stats = _measure(lambda: process_raw_file(raw_path), repeat, memory)
+        if wanted("process_raw_file"):
+            record("process_raw_file", len(raw), stats)
+
+        if wanted("validate_file"):
+            # Untimed first call: importing great_expectations takes seconds
+            validate_file(processed_path)
+            _, stats = _measure(lambda: validate_file(processed_path), repeat, False)
+            record("validate_file", len(raw), stats)
+
+        df, stats = _measure(lambda: load_processed_data(files=[processed_path]), repeat, memory)
+        if wanted("load_processed_data"):
+            record("load_processed_data", len(df), stats)
+
+        aligned, stats = _measure(lambda: align_sources(df), repeat, memory)
+        if wanted("align_sources"):
+            record("align_sources", len(aligned), stats)
+
+        feats, stats = _measure(lambda: build_features(aligned), repeat, memory)
+        if wanted("build_features"):
+            record("build_features", len(feats), stats)
+
+        if not {"train", "serving_warm_up", "predict"} & set(stages):
+            return results
+
+        horizons = list(DEFAULT_HORIZONS)
+        train_df, targets = add_targets(feats, horizons)
+        features = get_feature_columns(train_df)
+        X_train, y_train, X_test, y_test = split_xy(train_df, features, targets)
+        params = get_params(test_run=True, multi_output=True)
+        model, stats = _measure(lambda: fit_model(X_train, y_train, X_test, y_test, params), 1, memory)
+        if wanted("train"):
+            record("train", len(X_train), stats, n_estimators=params["n_estimators"], horizons=len(targets))
+        model.get_booster().set_attr(horizons=",".join(horizons))
+        model.save_model(root / "model.json")
+
+        import serving.main as serving_main
+        import serving.model_loader as model_loader
+
+        def warm_up():
+            model_loader._model = None
+            serving_main._features = None
+            serving_main.get_model()
+            return serving_main.get_latest_features()
+
+        snapshot, stats = _measure(warm_up, 1, memory)
+        if wanted("serving_warm_up"):
+            record("serving_warm_up", len(snapshot), stats)
+
+        if wanted("predict"):
+            sample = snapshot["interval_start_utc"].sample(
+                n=min(len(snapshot), 100), random_state=seed
+            )
+            timestamps = [ts.isoformat() for ts in sample]
+            latencies = asyncio.run(_predict_latencies(serving_main.app, timestamps, predict_requests))
+            stats = {
+                "seconds": statistics.median(latencies),
+                "seconds_min": min(latencies),
+                "peak_mb": None,
+                "p95_seconds": _percentile(latencies, 95),
+                "requests": predict_requests,
+            }
+            record("predict", len(snapshot), stats)
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent,
+            timeout=10,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_suite(
+    scales: Dict[str, Tuple[int, int]],
+    stages: List[str] | None = None,
+    repeat: int = 3,
+    memory: bool = True,
+    predict_requests: int = 50,
+) -> dict:
+    stages = stages or STAGES
+    results = []
+    for name, (nodes, days) in scales.items():
+        results.extend(run_scale(name, nodes, days, stages, repeat, memory, predict_requests))
+    return {
+        "meta": {
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    threshold: float = 0.25,
+    min_seconds: float = 0.005,
+    min_mb: float = 1.0,
+) -> List[str]:
+    """Regressions of `current` vs `baseline`, matched on (scale, stage).
+
+    A stage regresses when its median time or peak memory grows by more
+    than `threshold` (relative) and by more than the absolute noise floor.
+    """
+    base = {(r["scale"], r["stage"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for row in current.get("results", []):
+        ref = base.get((row["scale"], row["stage"]))
+        if ref is None:
+            continue
+        label = f"{row['scale']}/{row['stage']}"
+        if row["seconds"] > ref["seconds"] * (1 + threshold) and row["seconds"] - ref["seconds"] > min_seconds:
+            regressions.append(f"{label}: {ref['seconds']:.4f}s -> {row['seconds']:.4f}s")
+        if row.get("peak_mb") is not None and ref.get("peak_mb") is not None:
+            if row["peak_mb"] > ref["peak_mb"] * (1 + threshold) and row["peak_mb"] - ref["peak_mb"] > min_mb:
+                regressions.append(f"{label}: peak {ref['peak_mb']:.1f}MB -> {row['peak_mb']:.1f}MB")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic PJM data")
+    parser.add_argument(
+        "--scales",
+        type=str,
+        default="small,medium",
+        help=f"Comma separated names from {sorted(SCALES)} or NAME=NODESxDAYS",
+    )
+    parser.add_argument("--stages", type=str, default=",".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc runs")
+    parser.add_argument("--predict-requests", type=int, default=50)
+    parser.add_argument("--output", type=str, default=str(RESULTS_DIR / "latest.json"))
+    parser.add_argument("--baseline", type=str, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    scales = {}
+    for item in args.scales.split(","):
+        if "=" in item:
+            name, shape = item.split("=", 1)
+            nodes, days = shape.lower().split("x")
+            scales[name] = (int(nodes), int(days))
+        elif item in SCALES:
+            scales[item] = SCALES[item]
+        else:
+            raise SystemExit(f"Unknown scale {item}")
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages {sorted(unknown)}")
+
+    report = run_suite(scales, stages, args.repeat, not args.no_memory, args.predict_requests)
+
+    out = Path(args.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Wrote benchmark results to {out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(f"{len(regressions)} benchmark regression(s) beyond {args.threshold:.0%}")
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
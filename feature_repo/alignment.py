@@ -0,0 +1,136 @@
+from typing import Dict
+
+import pandas as pd
+
+from ingestion.schema import FORECAST_TIME_COLUMN, TIMESTAMP_COLUMN
+from pipeline.metrics import timed
+
+
+RT_SOURCE = "rt_lmp"
+DA_SOURCE = "da_lmp"
+LOAD_FORECAST_SOURCE = "load_forecast"
+LOAD_METERED_SOURCE = "load_metered"
+
+NODE_KEY = "node_id"
+
+# Columns added to the RT frame by align_sources.
+ALIGNED_COLUMNS = ["da_lmp", "load_forecast", "load_metered"]
+
+
+def split_sources(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Split the long multi-source frame into one frame per `source` value."""
+    return {
+        str(name): group
+        for name, group in df.groupby("source", observed=True, sort=False)
+    }
+
+
+def _asof(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    left_on: str,
+    right_on: str,
+    by: str | list[str] | None,
+    tolerance: pd.Timedelta | None,
+) -> pd.DataFrame:
+    # merge_asof needs both sides sorted on the as-of key; `by` groups are
+    # matched internally, so all nodes are aligned in one pass.
+    return pd.merge_asof(
+        left.sort_values(left_on, kind="stable"),
+        right.sort_values(right_on, kind="stable"),
+        left_on=left_on,
+        right_on=right_on,
+        by=by,
+        direction="backward",
+        tolerance=tolerance,
+        allow_exact_matches=True,
+    )
+
+
+def _node_by(frame: pd.DataFrame) -> str | None:
+    # Load data from PJM is area-wide and carries no pnode id; those sources
+    # are broadcast to every node instead of joined per node.
+    if NODE_KEY in frame.columns and frame[NODE_KEY].notna().any():
+        return NODE_KEY
+    return None
+
+
+@timed("align_sources")
+def align_sources(
+    df: pd.DataFrame,
+    da_tolerance: str = "1h",
+    forecast_freq: str = "1h",
+    forecast_tolerance: str | None = None,
+    metered_lag: str = "1h",
+    metered_tolerance: str = "2h",
+) -> pd.DataFrame:
+    """Align DA price and load sources onto the RT LMP grid.
+
+    Returns one row per RT interval and node (the RT rows of `df`) with
+    `da_lmp`, `load_forecast` and `load_metered` columns added. Every join
+    is a backward as-of join, so a row only sees values known at its
+    interval start:
+
+    - DA LMP: the DA price of the hour containing the RT interval, per node.
+    - Load forecast: for the forecast interval containing the RT interval,
+      the latest vintage (`forecast_time_utc`) published at or before it.
+      Rows without a vintage are treated as published at their interval start.
+    - Metered load: the latest value available at the RT interval, taking
+      each value as published `metered_lag` after its interval start.
+    """
+    sources = split_sources(df)
+    rt = sources.get(RT_SOURCE, df.iloc[0:0])
+
+    out = rt.drop(columns=["load", "load_forecast", FORECAST_TIME_COLUMN], errors="ignore")
+    out = out.dropna(subset=[TIMESTAMP_COLUMN]).reset_index(drop=True)
+    ts_dtype = out[TIMESTAMP_COLUMN].dtype
+
+    da = sources.get(DA_SOURCE)
+    if da is not None and not da.empty:
+        by = _node_by(da) if _node_by(out) else None
+        cols = [TIMESTAMP_COLUMN, "total_lmp"] + ([by] if by else [])
+        right = da[cols].dropna(subset=[TIMESTAMP_COLUMN])
+        right = right.rename(columns={"total_lmp": "da_lmp"})
+        tol = pd.Timedelta(da_tolerance)
+        out = _asof(out, right, TIMESTAMP_COLUMN, TIMESTAMP_COLUMN, by, tol)
+    else:
+        out["da_lmp"] = float("nan")
+
+    lf = sources.get(LOAD_FORECAST_SOURCE)
+    if lf is not None and not lf.empty:
+        vintage = lf[TIMESTAMP_COLUMN]
+        if FORECAST_TIME_COLUMN in lf.columns:
+            vintage = lf[FORECAST_TIME_COLUMN].fillna(vintage)
+        right = pd.DataFrame(
+            {
+                "_target": lf[TIMESTAMP_COLUMN],
+                "_vintage": vintage,
+                "load_forecast": lf["load_forecast"],
+            }
+        ).astype({"_target": ts_dtype, "_vintage": ts_dtype})
+        right = right.dropna().drop_duplicates(["_target", "_vintage"], keep="last")
+        out["_target"] = out[TIMESTAMP_COLUMN].dt.floor(forecast_freq)
+        tol = pd.Timedelta(forecast_tolerance) if forecast_tolerance else None
+        out = _asof(out, right, TIMESTAMP_COLUMN, "_vintage", "_target", tol)
+        out = out.drop(columns=["_target", "_vintage"])
+    else:
+        out["load_forecast"] = float("nan")
+
+    lm = sources.get(LOAD_METERED_SOURCE)
+    if lm is not None and not lm.empty:
+        right = pd.DataFrame(
+            {
+                "_available": lm[TIMESTAMP_COLUMN] + pd.Timedelta(metered_lag),
+                "load_metered": lm["load"],
+            }
+        ).astype({"_available": ts_dtype})
+        right = right.dropna().drop_duplicates("_available", keep="last")
+        tol = pd.Timedelta(metered_tolerance)
+        out = _asof(out, right, TIMESTAMP_COLUMN, "_available", None, tol)
+        out = out.drop(columns=["_available"])
+    else:
+        out["load_metered"] = float("nan")
+
+    for col in ALIGNED_COLUMNS:
+        out[col] = out[col].astype("float32")
+    return out
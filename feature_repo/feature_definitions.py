@@ -2,20 +2,51 @@ from datetime import timedelta
 
 import numpy as np
 import pandas as pd
+from pandas.core.groupby import SeriesGroupBy
+
+from feature_repo.alignment import ALIGNED_COLUMNS
+from pipeline.metrics import record_rows, timed
+
+
+def _float_dtype(values: pd.Series) -> np.dtype:
+    # Keep float32 inputs (processed schema) float32; pandas rolling upcasts.
+    return np.float32 if values.dtype == np.float32 else np.float64
+
+
+def _per_node(df: pd.DataFrame, col: str):
+    # Multi-node frames (see feature_repo.alignment) are lagged per node in one
+    # grouped pass; single-node frames keep the plain series path.
+    if "node_id" in df.columns and df["node_id"].nunique(dropna=False) > 1:
+        return df.groupby("node_id", sort=False, dropna=False, observed=True)[col]
+    return df[col]
+
+
+def _rolling(df: pd.DataFrame, col: str, window: int, how: str) -> pd.Series:
+    values = _per_node(df, col)
+    result = getattr(values.rolling(window=window), how)()
+    if isinstance(values, SeriesGroupBy):
+        result = result.droplevel(0)
+    return result.astype(_float_dtype(df[col]))
+
+
+# History needed before a row has every lag and rolling feature (the 168h
+# lag), plus a day of complete rows to serve from.
+FEATURE_LOOKBACK = timedelta(hours=168) + timedelta(days=1)
 
 
 def add_lag_features(df: pd.DataFrame) -> pd.DataFrame:
     df = df.sort_values("interval_start_utc")
-    df["lmp_lag_1h"] = df["total_lmp"].shift(12)  # 12 * 5min = 60 minutes
-    df["lmp_lag_24h"] = df["total_lmp"].shift(12 * 24)
-    df["lmp_lag_168h"] = df["total_lmp"].shift(12 * 24 * 7)
+    lmp = _per_node(df, "total_lmp")
+    df["lmp_lag_1h"] = lmp.shift(12)  # 12 * 5min = 60 minutes
+    df["lmp_lag_24h"] = lmp.shift(12 * 24)
+    df["lmp_lag_168h"] = lmp.shift(12 * 24 * 7)
     return df
 
 
 def add_rolling_features(df: pd.DataFrame) -> pd.DataFrame:
     window = 12 * 24  # 24h window for 5-min data
-    df["lmp_rolling_mean_24h"] = df["total_lmp"].rolling(window=window).mean()
-    df["lmp_rolling_std_24h"] = df["total_lmp"].rolling(window=window).std()
+    df["lmp_rolling_mean_24h"] = _rolling(df, "total_lmp", window, "mean")
+    df["lmp_rolling_std_24h"] = _rolling(df, "total_lmp", window, "std")
     return df
 
 
@@ -23,22 +54,85 @@ def add_cyclical_time_features(df: pd.DataFrame) -> pd.DataFrame:
     df["hour"] = df["interval_start_utc"].dt.hour
     df["dow"] = df["interval_start_utc"].dt.dayofweek
 
-    df["hour_sin"] = np.sin(2 * np.pi * df["hour"] / 24)
-    df["hour_cos"] = np.cos(2 * np.pi * df["hour"] / 24)
+    df["hour_sin"] = np.sin(2 * np.pi * df["hour"] / 24).astype(np.float32)
+    df["hour_cos"] = np.cos(2 * np.pi * df["hour"] / 24).astype(np.float32)
 
-    df["dow_sin"] = np.sin(2 * np.pi * df["dow"] / 7)
-    df["dow_cos"] = np.cos(2 * np.pi * df["dow"] / 7)
+    df["dow_sin"] = np.sin(2 * np.pi * df["dow"] / 7).astype(np.float32)
+    df["dow_cos"] = np.cos(2 * np.pi * df["dow"] / 7).astype(np.float32)
     return df
 
 
+@timed("build_features")
 def build_features(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df = add_lag_features(df)
     df = add_rolling_features(df)
     df = add_cyclical_time_features(df)
+    # align_sources always emits ALIGNED_COLUMNS; keep them even when empty
+    # so the feature set doesn't depend on which sources a file covers.
     na_ratio = df.isna().mean()
-    drop_cols = na_ratio[na_ratio > 0.99].index.tolist()
+    drop_cols = [c for c in na_ratio[na_ratio > 0.99].index if c not in ALIGNED_COLUMNS]
     if drop_cols:
         df = df.drop(columns=drop_cols)
-    df = df.dropna()
+    # Aligned exogenous columns (e.g. a load forecast only fetched for today)
+    # may be sparse; keep those rows and let the model see the gaps.
+    df = df.dropna(subset=[c for c in df.columns if c not in ALIGNED_COLUMNS])
+    record_rows("build_features", len(df))
+    return df
+
+
+# Forecast horizons, as pandas Timedelta strings ("5m" is five minutes)
+DEFAULT_HORIZONS = ("5m", "1h", "4h", "24h")
+
+
+def parse_horizons(names=DEFAULT_HORIZONS) -> dict:
+    horizons = {}
+    for name in names:
+        delta = pd.Timedelta(name).to_pytimedelta()
+        if delta <= timedelta(0):
+            raise ValueError(f"Horizon must be positive: {name}")
+        horizons[name] = delta
+    return horizons
+
+
+def target_column(horizon: str) -> str:
+    return f"target_lmp_{horizon}"
+
+
+def add_horizon_targets(df: pd.DataFrame, horizons: dict | None = None) -> pd.DataFrame:
+    """Add total_lmp at t + horizon per node as target_lmp_<horizon> columns.
+
+    All nodes and horizons are looked up in one vectorized pass: rows are
+    keyed by (node, seconds), and each shifted key is matched exactly with a
+    single searchsorted, so feed gaps give NaN rather than a wrong target.
+    """
+    horizons = horizons or parse_horizons()
+    if df.empty:
+        for name in horizons:
+            df[target_column(name)] = np.array([], dtype=np.float32)
+        return df
+
+    seconds = pd.DatetimeIndex(df["interval_start_utc"]).asi8 // 1_000_000_000
+    if "node_id" in df.columns:
+        codes = pd.factorize(df["node_id"])[0].astype(np.int64)
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+    deltas = np.array([int(d.total_seconds()) for d in horizons.values()], dtype=np.int64)
+
+    # Each node gets a key range wide enough that shifted keys never spill
+    # into the next node's range.
+    offset = seconds - seconds.min()
+    span = offset.max() + deltas.max() + 1
+    keys = codes * span + offset
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    values = df["total_lmp"].to_numpy(dtype=_float_dtype(df["total_lmp"]), na_value=np.nan)[order]
+
+    wanted = keys[:, None] + deltas[None, :]
+    pos = np.minimum(np.searchsorted(sorted_keys, wanted), len(sorted_keys) - 1)
+    targets = np.where(sorted_keys[pos] == wanted, values[pos], np.nan).astype(values.dtype)
+
+    for i, name in enumerate(horizons):
+        df[target_column(name)] = targets[:, i]
     return df
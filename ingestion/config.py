@@ -10,7 +10,7 @@ if ENV_PATH.exists():
     load_dotenv(ENV_PATH)
 
 
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR / "data")))
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
@@ -22,11 +22,35 @@ class Settings:
     s3_bucket_raw: str = os.getenv("S3_BUCKET_RAW", "")
     s3_bucket_processed: str = os.getenv("S3_BUCKET_PROCESSED", "")
     use_s3: bool = os.getenv("USE_S3", "0") == "1"
+    s3_endpoint_url: str = os.getenv("S3_ENDPOINT_URL", "")
+    s3_max_concurrency: int = int(os.getenv("S3_MAX_CONCURRENCY", "10"))
+    s3_multipart_chunksize_mb: int = int(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", "8"))
+    s3_cache_dir: str = os.getenv("S3_CACHE_DIR", str(DATA_DIR / "s3_cache"))
+    s3_cache_max_mb: int = int(os.getenv("S3_CACHE_MAX_MB", "2048"))
+
+    model_path: str = os.getenv("MODEL_PATH", "data/models/xgb_rt_lmp.json")
+    # Seconds between checks for a newer processed file while serving
+    feature_refresh_seconds: float = float(os.getenv("FEATURE_REFRESH_SECONDS", "60"))
+
+    # Stage timers/counters; METRICS_TRACE_MEMORY adds tracemalloc peaks
+    # (noticeably slower, meant for batch runs being investigated)
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "1") == "1"
+    metrics_trace_memory: bool = os.getenv("METRICS_TRACE_MEMORY", "0") == "1"
+    # JSON run report written when a `pjm` batch command finishes
+    metrics_report_path: str = os.getenv("METRICS_REPORT_PATH", "")
 
     pjm_node_id: int = int(os.getenv("PJM_NODE_ID", "51217"))
     pjm_market_rt: str = os.getenv("PJM_MARKET_RT", "REAL_TIME_5_MIN")
     pjm_market_da: str = os.getenv("PJM_MARKET_DA", "DAY_AHEAD_HOURLY")
 
+    parquet_compression: str = os.getenv("PARQUET_COMPRESSION", "zstd")
+    parquet_compression_level: int | None = (
+        int(os.getenv("PARQUET_COMPRESSION_LEVEL", "3"))
+        if os.getenv("PARQUET_COMPRESSION_LEVEL", "3")
+        else None
+    )
+    parquet_row_group_size: int = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "131072"))
+
 
 settings = Settings()
 
@@ -4,9 +4,35 @@ import argparse
 import pandas as pd
 
 from ingestion.config import RAW_DIR, PROCESSED_DIR, ensure_local_dirs, settings
-
-
-def process_raw_file(raw_path: Path) -> Path:
+from ingestion.schema import (
+    PROCESSED_COLUMNS,
+    enforce_processed_schema,
+    format_size_report,
+    size_report,
+    write_processed_parquet,
+)
+from ingestion.storage import get_storage
+from pipeline.metrics import record_rows, timed
+
+
+def _coalesce_utc(df: pd.DataFrame, candidates: list[str]) -> pd.Series | None:
+    # Raw files concat several gridstatus frames whose timestamp columns differ,
+    # so take the first non-null value across the candidates present.
+    present = [c for c in candidates if c in df.columns]
+    if not present:
+        return None
+    ts = pd.to_datetime(df[present[0]], errors="coerce", utc=True)
+    for col in present[1:]:
+        ts = ts.fillna(pd.to_datetime(df[col], errors="coerce", utc=True))
+    return ts
+
+
+def processed_path_for(raw_path: Path) -> Path:
+    return PROCESSED_DIR / raw_path.name.replace("raw", "processed")
+
+
+@timed("etl")
+def process_raw_file(raw_path: Path, report_sizes: bool = False) -> Path:
     ensure_local_dirs()
     print(f"Processing {raw_path}")
 
@@ -19,16 +45,17 @@ def process_raw_file(raw_path: Path) -> Path:
         "Time",
         "Forecast Time",
     ]
-    ts_col = next((c for c in ts_candidates if c in df.columns), None)
-    if ts_col is None:
+    ts = _coalesce_utc(df, ts_candidates)
+    if ts is None:
         raise ValueError("Could not find timestamp column in raw data")
-    ts = pd.to_datetime(df[ts_col], errors="coerce")
-    if hasattr(ts, "dt") and ts.dt.tz is not None:
-        ts = ts.dt.tz_convert("UTC")
-    else:
-        ts = pd.to_datetime(ts, utc=True)
     df["interval_start_utc"] = ts
 
+    # Forecast vintage, used downstream to avoid lookahead in as-of joins
+    vintage_candidates = ["forecast_time_utc", "Publish Time", "Forecast Time"]
+    vintage = _coalesce_utc(df, vintage_candidates)
+    if vintage is not None:
+        df["forecast_time_utc"] = vintage
+
     col_map = {
         "Location": "node_id",
         "Location Name": "node_name",
@@ -42,56 +69,48 @@ def process_raw_file(raw_path: Path) -> Path:
     df = df.rename(columns=present_map)
 
     # Example: keep subset of columns
-    keep_cols = [
-        "interval_start_utc",
-        "node_id",
-        "node_name",
-        "total_lmp",
-        "congestion_price",
-        "marginal_loss_price",
-        "load",
-        "load_forecast",
-        "source",
-    ]
-    for col in keep_cols:
+    for col in PROCESSED_COLUMNS:
         if col not in df.columns:
             df[col] = None
 
-    df = df[keep_cols]
+    legacy = df[PROCESSED_COLUMNS] if report_sizes else None
+    df = enforce_processed_schema(df[PROCESSED_COLUMNS])
 
     # Negative prices allowed, but clip insane outliers
-    df["total_lmp"] = pd.to_numeric(df["total_lmp"], errors="coerce")
     df["total_lmp"] = df["total_lmp"].clip(lower=-200, upper=5000)
 
-    out_name = raw_path.name.replace("raw", "processed")
-    out_path = PROCESSED_DIR / out_name
-    df.to_parquet(out_path, index=False)
+    if legacy is not None:
+        print(f"Size report: {format_size_report(size_report(legacy, df))}")
+
+    record_rows("etl", len(df))
+    out_path = processed_path_for(raw_path)
+    write_processed_parquet(df, out_path)
     print(f"Wrote processed data to {out_path}")
 
     if settings.use_s3:
-        try:
-            import boto3
-        except Exception:
-            raise SystemExit("USE_S3=1 requires boto3 installed")
         if not settings.s3_bucket_processed:
             raise SystemExit("S3_BUCKET_PROCESSED must be set when USE_S3=1")
-        s3 = boto3.client("s3", region_name=settings.aws_region)
         key = f"processed/{out_path.name}"
-        s3.upload_file(str(out_path), settings.s3_bucket_processed, key)
-        print(f"Uploaded {out_path} to s3://{settings.s3_bucket_processed}/{key}")
+        uri = get_storage().upload_file(out_path, settings.s3_bucket_processed, key)
+        print(f"Uploaded {out_path} to {uri}")
     return out_path
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--raw-path", type=str, required=True)
-    args = parser.parse_args()
+    parser.add_argument(
+        "--size-report",
+        action="store_true",
+        help="Print in-memory and on-disk size before/after schema enforcement",
+    )
+    args = parser.parse_args(argv)
 
     raw_path = Path(args.raw_path)
     if not raw_path.exists():
         raise SystemExit(f"{raw_path} does not exist")
 
-    process_raw_file(raw_path)
+    process_raw_file(raw_path, report_sizes=args.size_report)
 
 
 if __name__ == "__main__":
@@ -3,18 +3,32 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pandas as pd
-from gridstatus import PJM
 
 from ingestion.config import RAW_DIR, ensure_local_dirs, settings
+from ingestion.storage import get_storage
+from pipeline.metrics import record_rows, timed
 
 
 def _parse_date(date_str: str) -> datetime:
     return datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
 
 
-def fetch_lmp_and_load(start_date: datetime, end_date: datetime) -> None:
+def raw_path_for(start_date: datetime, end_date: datetime) -> Path:
+    return RAW_DIR / f"pjm_raw_{start_date:%Y%m%d}_{end_date:%Y%m%d}.parquet"
+
+
+@timed("fetch")
+def fetch_lmp_and_load(start_date: datetime, end_date: datetime, client=None) -> Path:
+    """Fetch one window of PJM data to RAW_DIR and return the raw file path.
+
+    `client` defaults to a gridstatus PJM client; any object with the same
+    get_lmp/get_load_forecast/get_load methods can be passed instead.
+    """
     ensure_local_dirs()
-    client = PJM()
+    if client is None:
+        from gridstatus import PJM
+
+        client = PJM()
 
     print(f"Fetching data from {start_date} to {end_date} (UTC)")
 
@@ -42,25 +56,22 @@ def fetch_lmp_and_load(start_date: datetime, end_date: datetime) -> None:
     load_metered["source"] = "load_metered"
 
     df = pd.concat([rt, da, load_forecast, load_metered], ignore_index=True)
+    record_rows("fetch", len(df))
 
-    out_path = RAW_DIR / f"pjm_raw_{start_date:%Y%m%d}_{end_date:%Y%m%d}.parquet"
+    out_path = raw_path_for(start_date, end_date)
     df.to_parquet(out_path, index=False)
     print(f"Wrote raw data to {out_path}")
 
     if settings.use_s3:
-        try:
-            import boto3
-        except Exception as e:
-            raise SystemExit("USE_S3=1 requires boto3 installed")
         if not settings.s3_bucket_raw:
             raise SystemExit("S3_BUCKET_RAW must be set when USE_S3=1")
-        s3 = boto3.client("s3", region_name=settings.aws_region)
         key = f"raw/{out_path.name}"
-        s3.upload_file(str(out_path), settings.s3_bucket_raw, key)
-        print(f"Uploaded {out_path} to s3://{settings.s3_bucket_raw}/{key}")
+        uri = get_storage().upload_file(out_path, settings.s3_bucket_raw, key)
+        print(f"Uploaded {out_path} to {uri}")
+    return out_path
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--start-date", type=str, help="YYYY-MM-DD")
     parser.add_argument("--end-date", type=str, help="YYYY-MM-DD")
@@ -69,7 +80,7 @@ def main() -> None:
         action="store_true",
         help="Use last 1 day of data for quick testing",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.test_run:
         end = datetime.now(timezone.utc)
@@ -0,0 +1,163 @@
+import io
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ingestion.config import settings
+
+
+TIMESTAMP_COLUMN = "interval_start_utc"
+# Publish time of a forecast row (its vintage); null for observed sources.
+FORECAST_TIME_COLUMN = "forecast_time_utc"
+TIMESTAMP_COLUMNS = [TIMESTAMP_COLUMN, FORECAST_TIME_COLUMN]
+CATEGORICAL_COLUMNS = ["node_name", "source"]
+FLOAT_COLUMNS = [
+    "total_lmp",
+    "congestion_price",
+    "marginal_loss_price",
+    "load",
+    "load_forecast",
+]
+
+# Column order of every processed parquet file.
+PROCESSED_COLUMNS = [
+    TIMESTAMP_COLUMN,
+    "node_id",
+    "node_name",
+    "total_lmp",
+    "congestion_price",
+    "marginal_loss_price",
+    "load",
+    "load_forecast",
+    FORECAST_TIME_COLUMN,
+    "source",
+]
+
+PROCESSED_DTYPES: Dict[str, str] = {
+    TIMESTAMP_COLUMN: "datetime64[ns, UTC]",
+    "node_id": "Int32",
+    "node_name": "category",
+    "total_lmp": "float32",
+    "congestion_price": "float32",
+    "marginal_loss_price": "float32",
+    "load": "float32",
+    "load_forecast": "float32",
+    FORECAST_TIME_COLUMN: "datetime64[ns, UTC]",
+    "source": "category",
+}
+
+_INT32_MIN = np.iinfo(np.int32).min
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def _to_utc(values: pd.Series) -> pd.Series:
+    ts = pd.to_datetime(values, errors="coerce", utc=True)
+    return ts.astype("datetime64[ns, UTC]")
+
+
+def _to_node_id(values: pd.Series) -> pd.Series:
+    ids = pd.to_numeric(values, errors="coerce")
+    lo, hi = ids.min(), ids.max()
+    if pd.notnull(lo) and (lo < _INT32_MIN or hi > _INT32_MAX):
+        # Some PJM pnode ids exceed int32; keep them exact rather than wrap.
+        print("node_id values exceed int32 range, widening to Int64")
+        return ids.astype("Int64")
+    return ids.astype(PROCESSED_DTYPES["node_id"])
+
+
+def _to_category(values: pd.Series) -> pd.Series:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories()
+    return values.astype("category")
+
+
+def enforce_processed_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Return `df` with the processed columns, in order, cast to PROCESSED_DTYPES.
+
+    Missing columns are added as typed all-null columns. Extra columns are
+    kept after the schema columns so feature frames can pass through.
+    """
+    out = {}
+    n = len(df)
+    for col in PROCESSED_COLUMNS:
+        if col in df.columns:
+            values = df[col]
+        else:
+            values = pd.Series([None] * n, index=df.index, dtype=object)
+
+        if col in TIMESTAMP_COLUMNS:
+            out[col] = _to_utc(values)
+        elif col == "node_id":
+            out[col] = _to_node_id(values)
+        elif col in CATEGORICAL_COLUMNS:
+            out[col] = _to_category(values)
+        else:
+            out[col] = pd.to_numeric(values, errors="coerce").astype(PROCESSED_DTYPES[col])
+
+    extra = [c for c in df.columns if c not in PROCESSED_DTYPES]
+    result = pd.DataFrame(out, index=df.index)
+    if extra:
+        result = pd.concat([result, df[extra]], axis=1)
+    return result
+
+
+def parquet_write_options() -> dict:
+    codec = settings.parquet_compression or None
+    if codec and codec.lower() in ("none", "uncompressed"):
+        codec = None
+    opts = {
+        "engine": "pyarrow",
+        "compression": codec,
+        "row_group_size": settings.parquet_row_group_size,
+    }
+    # The default level is meant for zstd; codecs like snappy reject any level.
+    if (
+        codec
+        and settings.parquet_compression_level is not None
+        and pa.Codec.supports_compression_level(codec)
+    ):
+        opts["compression_level"] = settings.parquet_compression_level
+    return opts
+
+
+def write_processed_parquet(df: pd.DataFrame, path) -> None:
+    df.to_parquet(path, index=False, **parquet_write_options())
+
+
+def _parquet_nbytes(df: pd.DataFrame, **opts) -> int:
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False, **opts)
+    return buf.getbuffer().nbytes
+
+
+def size_report(legacy_df: pd.DataFrame, compact_df: pd.DataFrame) -> Dict[str, int]:
+    """Compare the untyped (object/None) frame with the schema-enforced one.
+
+    "before" sizes use the pandas defaults the ETL used to write with
+    (snappy, single row group); "after" uses parquet_write_options().
+    """
+    return {
+        "rows": int(len(compact_df)),
+        "memory_bytes_before": int(legacy_df.memory_usage(deep=True).sum()),
+        "memory_bytes_after": int(compact_df.memory_usage(deep=True).sum()),
+        "disk_bytes_before": _parquet_nbytes(legacy_df, engine="pyarrow"),
+        "disk_bytes_after": _parquet_nbytes(compact_df, **parquet_write_options()),
+    }
+
+
+def format_size_report(report: Dict[str, int]) -> str:
+    def _ratio(before: int, after: int) -> str:
+        return f"{after / before:.2f}x" if before else "n/a"
+
+    mb = 1024 * 1024
+    return (
+        f"rows={report['rows']} "
+        f"memory {report['memory_bytes_before'] / mb:.2f}MB -> "
+        f"{report['memory_bytes_after'] / mb:.2f}MB "
+        f"({_ratio(report['memory_bytes_before'], report['memory_bytes_after'])}), "
+        f"disk {report['disk_bytes_before'] / mb:.2f}MB -> "
+        f"{report['disk_bytes_after'] / mb:.2f}MB "
+        f"({_ratio(report['disk_bytes_before'], report['disk_bytes_after'])})"
+    )
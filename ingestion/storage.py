@@ -0,0 +1,319 @@
+import hashlib
+import io
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path, PurePosixPath
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ingestion.config import settings
+
+
+MB = 1024 * 1024
+
+
+class S3RangeFile(io.RawIOBase):
+    """Read-only, seekable view of one S3 object; every read is a ranged GET.
+
+    Reads are pinned to the ETag seen when the file was opened, so an object
+    replaced mid-read fails instead of mixing two versions.
+    """
+
+    def __init__(self, client, bucket: str, key: str, size: int, etag: str):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.etag = etag
+        self._pos = 0
+        self.requests = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buf) -> int:
+        end = min(self._pos + len(buf), self.size)
+        if end <= self._pos:
+            return 0
+        resp = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Range=f"bytes={self._pos}-{end - 1}",
+            IfMatch=self.etag,
+        )
+        data = resp["Body"].read()
+        self.requests += 1
+        n = len(data)
+        buf[:n] = data
+        self._pos += n
+        return n
+
+
+class LocalCache:
+    """Size-bounded directory of downloaded objects keyed by (bucket, key, ETag).
+
+    A new ETag for a key replaces older copies; when the directory exceeds
+    `max_bytes` the least recently used files are evicted.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key_prefix(bucket: str, key: str) -> str:
+        return hashlib.sha1(f"{bucket}/{key}".encode()).hexdigest()[:16]
+
+    def path_for(self, bucket: str, key: str, etag: str) -> Path:
+        suffix = Path(key).suffix
+        etag = etag.strip('"')
+        return self.root / f"{self._key_prefix(bucket, key)}-{etag}{suffix}"
+
+    def get(self, bucket: str, key: str, etag: str) -> Optional[Path]:
+        path = self.path_for(bucket, key, etag)
+        if not path.exists():
+            return None
+        os.utime(path)  # mark as recently used
+        return path
+
+    def add(self, path: Path, bucket: str, key: str) -> None:
+        """Register a freshly written cache file and enforce the size bound."""
+        prefix = self._key_prefix(bucket, key)
+        with self._lock:
+            for old in self.root.glob(f"{prefix}-*"):
+                if old != path and not old.name.endswith(".part"):
+                    old.unlink(missing_ok=True)
+            self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        files = [p for p in self.root.iterdir() if p.is_file() and not p.name.endswith(".part")]
+        total = sum(p.stat().st_size for p in files)
+        for p in sorted(files, key=lambda f: f.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            total -= p.stat().st_size
+            p.unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        if not self.root.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.root.iterdir() if p.is_file())
+
+
+class S3Storage:
+    """Shared S3 access for ingestion, training and serving.
+
+    One pooled, thread-safe boto3 client is reused for all calls. Uploads
+    and downloads go through boto3's managed transfer (concurrent multipart
+    above `multipart_chunksize`), parquet can be read by row group with
+    ranged GETs, and `cached_path` keeps a local read-through copy.
+    """
+
+    def __init__(
+        self,
+        region: str | None = None,
+        endpoint_url: str | None = None,
+        max_concurrency: int | None = None,
+        multipart_chunksize: int | None = None,
+        cache_dir: Path | None = None,
+        cache_max_bytes: int | None = None,
+    ):
+        self.region = region or settings.aws_region
+        self.endpoint_url = endpoint_url or settings.s3_endpoint_url or None
+        self.max_concurrency = max_concurrency or settings.s3_max_concurrency
+        self.multipart_chunksize = multipart_chunksize or settings.s3_multipart_chunksize_mb * MB
+        self.cache = LocalCache(
+            Path(cache_dir or settings.s3_cache_dir),
+            cache_max_bytes if cache_max_bytes is not None else settings.s3_cache_max_mb * MB,
+        )
+        self._client = None
+        self._transfer_config = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    try:
+                        import boto3
+                        from boto3.s3.transfer import TransferConfig
+                        from botocore.config import Config
+                    except Exception:
+                        raise SystemExit("USE_S3=1 requires boto3 installed")
+                    config = Config(
+                        max_pool_connections=self.max_concurrency * 2,
+                        retries={"max_attempts": 5, "mode": "adaptive"},
+                    )
+                    self._transfer_config = TransferConfig(
+                        multipart_threshold=self.multipart_chunksize,
+                        multipart_chunksize=self.multipart_chunksize,
+                        max_concurrency=self.max_concurrency,
+                        use_threads=True,
+                    )
+                    self._client = boto3.client(
+                        "s3",
+                        region_name=self.region,
+                        endpoint_url=self.endpoint_url,
+                        config=config,
+                    )
+        return self._client
+
+    def upload_file(self, path: Path, bucket: str, key: str) -> str:
+        client = self.client
+        client.upload_file(str(path), bucket, key, Config=self._transfer_config)
+        return f"s3://{bucket}/{key}"
+
+    def upload_files(self, items: Iterable[Tuple[Path, str, str]]) -> List[str]:
+        """Upload (path, bucket, key) items concurrently."""
+        items = list(items)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return list(pool.map(lambda item: self.upload_file(*item), items))
+
+    def download_file(self, bucket: str, key: str, dest: Path) -> Path:
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        client = self.client
+        client.download_file(bucket, key, str(dest), Config=self._transfer_config)
+        return dest
+
+    def list_keys(self, bucket: str, prefix: str = "") -> List[str]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        keys = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return sorted(keys)
+
+    def open(self, bucket: str, key: str) -> S3RangeFile:
+        head = self.client.head_object(Bucket=bucket, Key=key)
+        return S3RangeFile(self.client, bucket, key, head["ContentLength"], head["ETag"])
+
+    def read_parquet(
+        self,
+        bucket: str,
+        key: str,
+        columns: Sequence[str] | None = None,
+        row_groups: Sequence[int] | None = None,
+    ) -> pd.DataFrame:
+        """Read a parquet object (or some of its row groups) via ranged GETs."""
+        import pyarrow.parquet as pq
+
+        with self.open(bucket, key) as f:
+            pf = pq.ParquetFile(f, pre_buffer=True)
+            if row_groups is None:
+                table = pf.read(columns=columns)
+            else:
+                table = pf.read_row_groups(row_groups, columns=columns)
+        return table.to_pandas()
+
+    def cached_path(self, bucket: str, key: str) -> Path:
+        """Local copy of s3://bucket/key, downloaded only if its ETag changed."""
+        etag = self.client.head_object(Bucket=bucket, Key=key)["ETag"]
+        path = self.cache.get(bucket, key, etag)
+        if path is not None:
+            return path
+        path = self.cache.path_for(bucket, key, etag)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.part")
+        self.download_file(bucket, key, tmp)
+        tmp.replace(path)
+        self.cache.add(path, bucket, key)
+        return path
+
+    def cached_paths(self, bucket: str, keys: Sequence[str]) -> List[Path]:
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return list(pool.map(lambda k: self.cached_path(bucket, k), keys))
+
+
+_storage: Optional[S3Storage] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> S3Storage:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = S3Storage()
+    return _storage
+
+
+_WINDOW_RE = re.compile(r"_(\d{8})_(\d{8})\.parquet$")
+
+
+def file_window(name) -> Tuple[datetime, datetime] | None:
+    """(start, end) dates of a pjm_*_<start>_<end>.parquet file, if named so."""
+    match = _WINDOW_RE.search(PurePosixPath(str(name)).name)
+    if not match:
+        return None
+    return tuple(datetime.strptime(d, "%Y%m%d") for d in match.groups())
+
+
+def trailing_files(names: Sequence, lookback: timedelta) -> list:
+    """Newest of the name-sorted `names` whose windows span `lookback`.
+
+    Files without a date window in their name don't count towards the span.
+    Older files whose window starts where a newer one does are skipped, since
+    the newer file already covers them.
+    """
+    selected = []
+    newest_end = covered_from = None
+    for name in reversed(names):
+        window = file_window(name)
+        if window is None:
+            selected.append(name)
+            continue
+        start, end = window
+        if covered_from is not None and start >= covered_from:
+            continue
+        selected.append(name)
+        newest_end = newest_end or end
+        covered_from = start
+        if newest_end - covered_from >= lookback:
+            break
+    return selected[::-1]
+
+
+def processed_files_from_s3(
+    limit_files: int | None = None, lookback: timedelta | None = None
+) -> List[Path]:
+    """Read-through local copies of the processed parquet files in S3.
+
+    `limit_files` keeps the newest N files; `lookback` keeps the newest files
+    that together cover that much time (see trailing_files).
+    """
+    if not settings.s3_bucket_processed:
+        raise SystemExit("S3_BUCKET_PROCESSED must be set when USE_S3=1")
+    storage = get_storage()
+    keys = storage.list_keys(settings.s3_bucket_processed, "processed/pjm_processed_")
+    if limit_files:
+        keys = keys[-limit_files:]
+    if lookback is not None:
+        keys = trailing_files(keys, lookback)
+    return storage.cached_paths(settings.s3_bucket_processed, keys)
@@ -1,17 +1,22 @@
 import argparse
 from pathlib import Path
 import sys
+import threading
+from typing import TYPE_CHECKING, List
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-import great_expectations as gx
-from great_expectations.validator.validator import Validator
-from great_expectations.execution_engine.pandas_execution_engine import PandasExecutionEngine
-
 from ingestion.config import PROCESSED_DIR
+from pipeline.metrics import timed
+
+if TYPE_CHECKING:
+    from great_expectations.validator.validator import Validator
+
 
+_gx_lock = threading.Lock()
 
-def add_expectations(validator: Validator, df) -> None:
+
+def add_expectations(validator: "Validator", df) -> None:
     import pandas as pd
     timestamp_candidates = [
         "interval_start_utc",
@@ -128,7 +133,18 @@ def add_expectations(validator: Validator, df) -> None:
 
 
 def validate_file(processed_path: Path) -> None:
+    # great_expectations isn't thread-safe (the pipeline runner validates
+    # chunks from a thread pool), so validations run one at a time. The
+    # "validate" timer starts once the lock is held, so it excludes the wait.
+    with _gx_lock:
+        _validate_file(processed_path)
+
+
+@timed("validate")
+def _validate_file(processed_path: Path) -> None:
     print(f"Validating {processed_path}")
+    # great_expectations takes several seconds to import; defer it to here.
+    import great_expectations as gx
     import pandas as pd
     df = pd.read_parquet(processed_path)
     context = gx.get_context()
@@ -190,10 +206,10 @@ def validate_file(processed_path: Path) -> None:
     print("Validation passed.")
 
 
-def main() -> None:
+def main(argv: List[str] | None = None) -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--processed-path", type=str, required=True)
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     validate_file(Path(args.processed_path))
 
 
@@ -0,0 +1,290 @@
+"""Lightweight in-process metrics: counters, gauges, histograms and stage timers.
+
+Batch jobs dump them as a JSON run report; the API exposes them in the
+Prometheus text format on /metrics. With METRICS_ENABLED=0 every call
+returns after a single flag check.
+"""
+import functools
+import json
+import math
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from ingestion.config import settings
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# Covers both sub-millisecond serving steps and multi-minute batch stages
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0,
+)
+
+HELP = {
+    "pjm_stage_duration_seconds": "Wall time of an instrumented stage",
+    "pjm_stage_failures_total": "Stage calls that raised",
+    "pjm_stage_rows_total": "Rows produced by a stage",
+    "pjm_stage_peak_memory_bytes": "Traced peak memory of the last stage call",
+    "pjm_http_requests_total": "HTTP requests by path and status",
+    "pjm_http_request_duration_seconds": "HTTP request latency",
+    "pjm_serving_feature_rows": "Rows in the serving feature snapshot",
+    "pjm_serving_feature_reloads_total": "Feature snapshot rebuilds",
+    "pjm_process_max_rss_bytes": "Peak resident set size of the process",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_enabled = settings.metrics_enabled
+_trace_memory = settings.metrics_trace_memory
+_lock = threading.Lock()
+_counters: Dict[str, Dict[LabelKey, float]] = {}
+_gauges: Dict[str, Dict[LabelKey, float]] = {}
+_histograms: Dict[str, Dict[LabelKey, "_Histogram"]] = {}
+_local = threading.local()
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count", "min", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+
+def configure(enabled: bool | None = None, trace_memory: bool | None = None) -> None:
+    global _enabled, _trace_memory
+    if enabled is not None:
+        _enabled = enabled
+    if trace_memory is not None:
+        _trace_memory = trace_memory
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    if not _enabled:
+        return
+    key = _key(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        _gauges.setdefault(name, {})[_key(labels)] = float(value)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if not _enabled:
+        return
+    key = _key(labels)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = _Histogram()
+        hist.observe(value)
+
+
+def _memory_stack() -> List[int]:
+    stack = getattr(_local, "memory", None)
+    if stack is None:
+        stack = _local.memory = []
+    return stack
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as `name`; failures are counted and re-raised.
+
+    With METRICS_TRACE_MEMORY=1 the traced peak of the block is recorded
+    too. tracemalloc is process-wide, so stages running concurrently in
+    other threads share the same peak.
+    """
+    if not _enabled:
+        yield
+        return
+
+    track = _trace_memory
+    started = False
+    if track:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started = True
+        stack = _memory_stack()
+        # Fold the enclosing stage's peak so far into its entry before the
+        # reset, so nested stages don't hide it.
+        if stack:
+            stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        stack.append(0)
+
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        inc("pjm_stage_failures_total", stage=name)
+        raise
+    finally:
+        observe("pjm_stage_duration_seconds", time.perf_counter() - start, stage=name)
+        if track:
+            peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+            set_gauge("pjm_stage_peak_memory_bytes", peak, stage=name)
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+            if started:
+                tracemalloc.stop()
+
+
+def timed(name: str):
+    """Decorator form of `stage`."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_rows(name: str, rows: int) -> None:
+    inc("pjm_stage_rows_total", rows, stage=name)
+
+
+def _update_process_gauges() -> None:
+    if resource is None:
+        return
+    # ru_maxrss is in KiB on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    set_gauge("pjm_process_max_rss_bytes", rss)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: LabelKey, extra: Tuple[str, str] | None = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _header(name: str, kind: str) -> List[str]:
+    help_text = HELP.get(name, name)
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def render_prometheus() -> str:
+    """All series in the Prometheus text exposition format (0.0.4)."""
+    _update_process_gauges()
+    lines: List[str] = []
+    with _lock:
+        for name, series in sorted(_counters.items()):
+            lines += _header(name, "counter")
+            lines += [f"{name}{_labels(k)} {_fmt(v)}" for k, v in sorted(series.items())]
+        for name, series in sorted(_gauges.items()):
+            lines += _header(name, "gauge")
+            lines += [f"{name}{_labels(k)} {_fmt(v)}" for k, v in sorted(series.items())]
+        for name, series in sorted(_histograms.items()):
+            lines += _header(name, "histogram")
+            for k, hist in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(k, ('le', _fmt(bound)))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(k, ('le', '+Inf'))} {hist.count}")
+                lines.append(f"{name}_sum{_labels(k)} {_fmt(hist.sum)}")
+                lines.append(f"{name}_count{_labels(k)} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+def _series_name(name: str, key: LabelKey) -> str:
+    return name + _labels(key)
+
+
+def run_report() -> dict:
+    """JSON-friendly snapshot, with per-stage timing summaries up front."""
+    _update_process_gauges()
+    with _lock:
+        stages = {}
+        for key, hist in _histograms.get("pjm_stage_duration_seconds", {}).items():
+            name = dict(key)["stage"]
+            stages[name] = {
+                "calls": hist.count,
+                "seconds_total": hist.sum,
+                "seconds_mean": hist.sum / hist.count,
+                "seconds_min": hist.min,
+                "seconds_max": hist.max,
+                "failures": int(_counters.get("pjm_stage_failures_total", {}).get(key, 0)),
+                "rows": _counters.get("pjm_stage_rows_total", {}).get(key),
+                "peak_memory_bytes": _gauges.get("pjm_stage_peak_memory_bytes", {}).get(key),
+            }
+        return {
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+            "stages": dict(sorted(stages.items())),
+            "counters": {
+                _series_name(n, k): v for n, s in sorted(_counters.items()) for k, v in sorted(s.items())
+            },
+            "gauges": {
+                _series_name(n, k): v for n, s in sorted(_gauges.items()) for k, v in sorted(s.items())
+            },
+        }
+
+
+def write_run_report(path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run_report(), indent=2))
+    print(f"Wrote metrics report to {path}")
+    return path
@@ -0,0 +1,374 @@
+import argparse
+import hashlib
+import importlib.util
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ingestion.config import DATA_DIR
+
+
+CACHE_PATH = DATA_DIR / ".pipeline_cache.json"
+FAILED = ("failed", "blocked")
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[], object]
+    deps: List[str] = field(default_factory=list)
+    inputs: List[Path] = field(default_factory=list)
+    outputs: List[Path] = field(default_factory=list)
+    params: Dict[str, object] = field(default_factory=dict)
+    # Modules whose source is part of the fingerprint (the stage's code version)
+    code: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # ran | cached | failed | blocked
+    seconds: float = 0.0
+    rows: Optional[int] = None
+    fingerprint: str = ""
+    error: str = ""
+
+
+def _hash_bytes(chunks) -> str:
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_chunks(path: Path, size: int = 1 << 20):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+class _FileHasher:
+    """Content hashes memoized on (path, size, mtime) for the lifetime of a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, str] = {}
+
+    def __call__(self, path: Path) -> str:
+        st = path.stat()
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        digest = _hash_bytes(_read_chunks(path))
+        with self._lock:
+            self._cache[key] = digest
+        return digest
+
+
+def code_version(modules: List[str]) -> str:
+    chunks = []
+    for name in sorted(modules):
+        spec = importlib.util.find_spec(name)
+        if spec is None or not spec.origin:
+            raise ValueError(f"Cannot locate source for module {name}")
+        chunks.append(name.encode())
+        chunks.append(Path(spec.origin).read_bytes())
+    return _hash_bytes(chunks)
+
+
+def _parquet_rows(paths: List[Path]) -> Optional[int]:
+    paths = [p for p in paths if p.suffix == ".parquet" and p.exists()]
+    if not paths:
+        return None
+    import pyarrow.parquet as pq
+
+    return sum(pq.ParquetFile(p).metadata.num_rows for p in paths)
+
+
+class PipelineRunner:
+    """Run a DAG of stages, skipping those whose fingerprint is unchanged.
+
+    A stage's fingerprint covers its name, params, the source of its `code`
+    modules and the content of its `inputs`. A stage is skipped when the
+    manifest at `cache_path` holds the same fingerprint and every recorded
+    output still exists with the recorded content hash. Stages whose
+    dependencies are done are run concurrently on a thread pool.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        cache_path: Path = CACHE_PATH,
+        workers: int = 4,
+        force: bool = False,
+    ):
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Stage names must be unique")
+        self.stages = {s.name: s for s in stages}
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+        self.cache_path = Path(cache_path)
+        self.workers = workers
+        self.force = force
+        self._hash = _FileHasher()
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+        self._code_cache: Dict[tuple, str] = {}
+
+    def _load_manifest(self) -> dict:
+        if self.cache_path.exists():
+            try:
+                return json.loads(self.cache_path.read_text())
+            except json.JSONDecodeError:
+                print(f"Ignoring unreadable pipeline cache {self.cache_path}")
+        return {}
+
+    def _save_manifest(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._manifest, indent=2, sort_keys=True))
+        tmp.replace(self.cache_path)
+
+    def fingerprint(self, stage: Stage) -> str:
+        key = tuple(sorted(stage.code))
+        if key not in self._code_cache:
+            self._code_cache[key] = code_version(stage.code)
+        payload = {
+            "name": stage.name,
+            "params": stage.params,
+            "code": self._code_cache[key],
+            "inputs": {str(p): self._hash(p) for p in stage.inputs},
+        }
+        return _hash_bytes([json.dumps(payload, sort_keys=True, default=str).encode()])
+
+    def _is_fresh(self, stage: Stage, fp: str) -> bool:
+        entry = self._manifest.get(stage.name)
+        if self.force or not entry or entry.get("fingerprint") != fp:
+            return False
+        for path_str, digest in entry.get("outputs", {}).items():
+            path = Path(path_str)
+            if not path.exists() or self._hash(path) != digest:
+                return False
+        return True
+
+    def _run_stage(self, stage: Stage) -> StageResult:
+        start = time.perf_counter()
+        try:
+            fp = self.fingerprint(stage)
+            if self._is_fresh(stage, fp):
+                rows = self._manifest[stage.name].get("rows")
+                return StageResult(stage.name, "cached", time.perf_counter() - start, rows, fp)
+
+            stage.func()
+
+            missing = [str(p) for p in stage.outputs if not p.exists()]
+            if missing:
+                raise RuntimeError(f"Stage did not write outputs {missing}")
+            rows = _parquet_rows(stage.outputs) or _parquet_rows(stage.inputs)
+            entry = {
+                "fingerprint": fp,
+                "outputs": {str(p): self._hash(p) for p in stage.outputs},
+                "rows": rows,
+            }
+            with self._lock:
+                self._manifest[stage.name] = entry
+                self._save_manifest()
+            return StageResult(stage.name, "ran", time.perf_counter() - start, rows, fp)
+        except (Exception, SystemExit) as e:
+            with self._lock:
+                self._manifest.pop(stage.name, None)
+                self._save_manifest()
+            return StageResult(stage.name, "failed", time.perf_counter() - start, error=repr(e))
+
+    def run(self) -> List[StageResult]:
+        results: Dict[str, StageResult] = {}
+        pending = dict(self.stages)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    dep_results = [results.get(d) for d in stage.deps]
+                    if any(r is not None and r.status in FAILED for r in dep_results):
+                        results[name] = StageResult(name, "blocked")
+                        del pending[name]
+                    elif all(r is not None for r in dep_results):
+                        running[pool.submit(self._run_stage, stage)] = name
+                        del pending[name]
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle among stages {sorted(pending)}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[running.pop(future)] = result
+        return [results[name] for name in self.stages]
+
+
+def format_report(results: List[StageResult]) -> str:
+    width = max([len(r.name) for r in results] + [5])
+    lines = [f"{'stage':<{width}}  {'status':<7}  {'seconds':>8}  {'rows':>10}"]
+    for r in results:
+        rows = "" if r.rows is None else str(r.rows)
+        line = f"{r.name:<{width}}  {r.status:<7}  {r.seconds:>8.2f}  {rows:>10}"
+        if r.error:
+            line += f"  {r.error}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _chunks(start: datetime, end: datetime, chunk_days: int):
+    cur = start
+    while cur < end:
+        nxt = min(cur + timedelta(days=chunk_days), end)
+        yield cur, nxt
+        cur = nxt
+
+
+def build_pipeline(
+    start: datetime,
+    end: datetime,
+    chunk_days: int = 1,
+    client=None,
+    validate: bool = True,
+    train: bool = True,
+    test_run: bool = False,
+) -> List[Stage]:
+    """Stages for fetch -> ETL -> validate per chunk, then one training stage."""
+    from ingestion import etl_pipeline, fetch_pjm_data, validate_data
+
+    stages: List[Stage] = []
+    processed = []
+    train_deps = []
+    for chunk_start, chunk_end in _chunks(start, end, chunk_days):
+        tag = f"{chunk_start:%Y%m%d}_{chunk_end:%Y%m%d}"
+        raw_path = fetch_pjm_data.raw_path_for(chunk_start, chunk_end)
+        processed_path = etl_pipeline.processed_path_for(raw_path)
+        processed.append(processed_path)
+
+        def _fetch(s=chunk_start, e=chunk_end):
+            return fetch_pjm_data.fetch_lmp_and_load(s, e, client=client)
+
+        stages.append(
+            Stage(
+                name=f"fetch_{tag}",
+                func=_fetch,
+                outputs=[raw_path],
+                params={
+                    "start": chunk_start.isoformat(),
+                    "end": chunk_end.isoformat(),
+                    "client": type(client).__name__,
+                },
+                code=["ingestion.fetch_pjm_data", "ingestion.config"],
+            )
+        )
+        stages.append(
+            Stage(
+                name=f"etl_{tag}",
+                func=lambda p=raw_path: etl_pipeline.process_raw_file(p),
+                deps=[f"fetch_{tag}"],
+                inputs=[raw_path],
+                outputs=[processed_path],
+                code=["ingestion.etl_pipeline", "ingestion.schema", "ingestion.config"],
+            )
+        )
+        train_deps.append(f"etl_{tag}")
+        if validate:
+            stages.append(
+                Stage(
+                    name=f"validate_{tag}",
+                    func=lambda p=processed_path: validate_data.validate_file(p),
+                    deps=[f"etl_{tag}"],
+                    inputs=[processed_path],
+                    code=["ingestion.validate_data"],
+                )
+            )
+            train_deps.append(f"validate_{tag}")
+
+    if train:
+        from training import train_xgb
+
+        stages.append(
+            Stage(
+                name="train",
+                func=lambda: train_xgb.train_model(test_run=test_run, files=processed),
+                deps=train_deps,
+                inputs=processed,
+                outputs=[train_xgb.MODEL_PATH],
+                params={"test_run": test_run},
+                code=[
+                    "training.train_xgb",
+                    "feature_repo.alignment",
+                    "feature_repo.feature_definitions",
+                    "ingestion.schema",
+                ],
+            )
+        )
+    return stages
+
+
+def _parse_date(date_str: str) -> datetime:
+    return datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run fetch -> ETL -> validate -> train, skipping unchanged stages"
+    )
+    parser.add_argument("--start-date", type=str, help="YYYY-MM-DD")
+    parser.add_argument("--end-date", type=str, help="YYYY-MM-DD")
+    parser.add_argument("--chunk-days", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--force", action="store_true", help="Ignore the cache and rerun every stage"
+    )
+    parser.add_argument("--offline", action="store_true", help="Use the stubbed gridstatus client")
+    parser.add_argument("--no-validate", action="store_true")
+    parser.add_argument("--no-train", action="store_true")
+    parser.add_argument("--test-run", action="store_true", help="Quick training (fewer trees)")
+    parser.add_argument("--report", type=str, help="Write the stage report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if not args.start_date or not args.end_date:
+        raise SystemExit("--start-date and --end-date are required")
+    start = _parse_date(args.start_date)
+    end = _parse_date(args.end_date)
+
+    client = None
+    if args.offline:
+        from pipeline.stub_client import StubPJM
+
+        client = StubPJM()
+
+    stages = build_pipeline(
+        start,
+        end,
+        chunk_days=args.chunk_days,
+        client=client,
+        validate=not args.no_validate,
+        train=not args.no_train,
+        test_run=args.test_run,
+    )
+    results = PipelineRunner(stages, workers=args.workers, force=args.force).run()
+    print(format_report(results))
+
+    if args.report:
+        from pipeline.metrics import run_report
+
+        report = {"stages": [asdict(r) for r in results], "metrics": run_report()}
+        Path(args.report).write_text(json.dumps(report, indent=2))
+    if any(r.status in FAILED for r in results):
+        raise SystemExit("Pipeline failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from pipeline import synthetic
+
+
+DEFAULT_NODES = {51217: "AEP-DAYTON HUB", 51288: "WESTERN HUB"}
+
+
+class StubPJM:
+    """Offline stand-in for `gridstatus.PJM` returning deterministic data.
+
+    Frames use the same column names as gridstatus so they flow through
+    the real ETL. Values depend only on the requested window, so the same
+    window always produces the same raw file.
+    """
+
+    def __init__(self, nodes: dict[int, str] | None = None, seed: int = 0):
+        self.nodes = nodes or DEFAULT_NODES
+        self.seed = seed
+        # Per thread, since the pipeline runner fetches chunks concurrently
+        self._local = threading.local()
+
+    def _rng(self, start: datetime, salt: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, salt, int(start.timestamp())])
+
+    def get_lmp(self, market: str, start=None, end=None, date=None, **kwargs) -> pd.DataFrame:
+        start = pd.Timestamp(start or date)
+        end = pd.Timestamp(end) if end is not None else start + timedelta(days=1)
+        self._local.window = (start, end)
+        salt = 1 if "5_MIN" in market.upper() else 2
+        return synthetic.lmp_frame(start, end, market, self.nodes, self._rng(start, salt))
+
+    def get_load_forecast(self, date, **kwargs) -> pd.DataFrame:
+        # "today" resolves to the last LMP window so output stays deterministic.
+        window = getattr(self._local, "window", None)
+        if date == "today" and window is not None:
+            start, end = window
+        else:
+            start = pd.Timestamp(datetime.now() if date == "today" else date).floor("D")
+            end = start + timedelta(days=1)
+        return synthetic.load_forecast_frame(start, end, self._rng(start, 3))
+
+    def get_load(self, date, end=None, **kwargs) -> pd.DataFrame:
+        start = pd.Timestamp(date)
+        end = pd.Timestamp(end) if end is not None else start + timedelta(days=1)
+        return synthetic.load_frame(start, end, self._rng(start, 4))
@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+SOURCES = ("rt_lmp", "da_lmp", "load_forecast", "load_metered")
+
+
+@dataclass
+class SyntheticConfig:
+    """Shape of a synthetic PJM raw frame (nodes x days x sources)."""
+
+    nodes: int = 2
+    days: int = 8
+    sources: Tuple[str, ...] = SOURCES
+    start: str = "2025-01-01"
+    seed: int = 0
+    # Fraction of RT 5-min intervals dropped per node, to mimic feed gaps
+    gap_ratio: float = 0.01
+    # Fraction of LMP intervals replaced by a price spike (or a negative dip)
+    spike_ratio: float = 0.002
+    # Load forecast revisions published per target hour
+    forecast_vintages: int = 2
+    market_rt: str = "REAL_TIME_5_MIN"
+    market_da: str = "DAY_AHEAD_HOURLY"
+    node_ids: Sequence[int] = field(default_factory=list)
+
+
+def make_nodes(n: int, node_ids: Sequence[int] = ()) -> Dict[int, str]:
+    ids = list(node_ids) or [51217 + 71 * i for i in range(n)]
+    return {node_id: f"SYNTH NODE {node_id}" for node_id in ids[:n]}
+
+
+def _daily_shape(ts: pd.DatetimeIndex) -> np.ndarray:
+    hour = ts.hour.to_numpy() + ts.minute.to_numpy() / 60
+    dow = ts.dayofweek.to_numpy()
+    return np.sin(2 * np.pi * (hour - 6) / 24) - 0.15 * (dow >= 5)
+
+
+def _spikes(rng: np.random.Generator, n: int, ratio: float) -> np.ndarray:
+    """Multiplicative factors: mostly 1, with rare spikes (x5-x40) and dips."""
+    factor = np.ones(n)
+    hits = rng.random(n) < ratio
+    factor[hits] = rng.choice([-1.5, 5.0, 10.0, 40.0], size=hits.sum())
+    return factor
+
+
+def lmp_frame(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    market: str,
+    nodes: Dict[int, str],
+    rng: np.random.Generator,
+    gap_ratio: float = 0.0,
+    spike_ratio: float = 0.0,
+) -> pd.DataFrame:
+    """LMP rows in gridstatus column layout (5-min for RT markets, else hourly)."""
+    freq = "5min" if "5_MIN" in market.upper() else "1h"
+    ts = pd.date_range(start, end, freq=freq, inclusive="left", tz="UTC")
+    shape = _daily_shape(ts)
+
+    frames = []
+    for i, (node_id, node_name) in enumerate(nodes.items()):
+        energy = 32 + 12 * shape + 0.5 * i
+        congestion = rng.normal(0, 2, len(ts)) + 0.3 * i
+        loss = rng.normal(0, 0.3, len(ts))
+        lmp = (energy + congestion + loss) * _spikes(rng, len(ts), spike_ratio)
+        keep = rng.random(len(ts)) >= gap_ratio
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Interval Start": ts[keep],
+                    "Market": market,
+                    "Location": node_id,
+                    "Location Name": node_name,
+                    "Location Type": "HUB",
+                    "LMP": lmp[keep],
+                    "Energy": energy[keep],
+                    "Congestion": congestion[keep],
+                    "Loss": loss[keep],
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_forecast_frame(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    rng: np.random.Generator,
+    vintages: int = 1,
+) -> pd.DataFrame:
+    """Hourly load forecast; each target hour has `vintages` publish times."""
+    ts = pd.date_range(start, end, freq="1h", inclusive="left", tz="UTC")
+    base = 90000 + 15000 * _daily_shape(ts)
+    frames = []
+    for v in range(vintages):
+        # Older vintages are published earlier and are noisier
+        lead = timedelta(hours=12 * (vintages - v))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Interval Start": ts,
+                    "Publish Time": ts.floor("D") - lead,
+                    "Load Forecast": base + rng.normal(0, 400 * (vintages - v), len(ts)),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_frame(start: pd.Timestamp, end: pd.Timestamp, rng: np.random.Generator) -> pd.DataFrame:
+    ts = pd.date_range(start, end, freq="1h", inclusive="left", tz="UTC")
+    load = 90000 + 15000 * _daily_shape(ts) + rng.normal(0, 800, len(ts))
+    return pd.DataFrame({"Interval Start": ts, "Load": load})
+
+
+def generate_raw_frame(config: SyntheticConfig) -> pd.DataFrame:
+    """Long raw frame shaped like `fetch_lmp_and_load` output.
+
+    Deterministic for a given config: every source draws from its own
+    generator seeded from (seed, source).
+    """
+    start = pd.Timestamp(config.start, tz="UTC")
+    end = start + timedelta(days=config.days)
+    nodes = make_nodes(config.nodes, config.node_ids)
+
+    frames = []
+    for idx, source in enumerate(SOURCES):
+        if source not in config.sources:
+            continue
+        rng = np.random.default_rng([config.seed, idx])
+        if source == "rt_lmp":
+            df = lmp_frame(start, end, config.market_rt, nodes, rng, config.gap_ratio, config.spike_ratio)
+        elif source == "da_lmp":
+            df = lmp_frame(start, end, config.market_da, nodes, rng, 0.0, config.spike_ratio)
+        elif source == "load_forecast":
+            df = load_forecast_frame(start, end, rng, config.forecast_vintages)
+        else:
+            df = load_frame(start, end, rng)
+        df["source"] = source
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,70 @@
+import argparse
+import importlib
+import sys
+from typing import List
+
+
+# Subcommand -> (module, function taking argv, help). Modules are only
+# imported once their subcommand is chosen, so `pjm fetch` never loads
+# mlflow/xgboost and `pjm train` never loads great_expectations.
+COMMANDS = {
+    "fetch": ("ingestion.fetch_pjm_data", "main", "Fetch raw PJM data"),
+    "etl": ("ingestion.etl_pipeline", "main", "Process a raw parquet file"),
+    "validate": ("ingestion.validate_data", "main", "Validate a processed parquet file"),
+    "train": ("training.train_xgb", "main", "Train the XGBoost model"),
+    "pipeline": (
+        "pipeline.runner",
+        "main",
+        "Run the cached fetch -> ETL -> validate -> train DAG",
+    ),
+    "serve": ("pjm.cli", "serve", "Run the prediction API with uvicorn"),
+    "bench": ("benchmarks.run", "main", "Benchmark pipeline stages on synthetic data"),
+    "loadtest": ("benchmarks.loadtest", "main", "Load test the serving API"),
+}
+
+
+def serve(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="pjm serve")
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--reload", action="store_true")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(
+        "serving.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=args.reload,
+    )
+
+
+def main(argv: List[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="pjm",
+        description="PJM LMP forecasting pipeline",
+        epilog="Run `pjm <command> --help` for the options of a command.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, _, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text, add_help=False)
+    # Only the command name is parsed here; its options belong to the
+    # command's own parser.
+    args = parser.parse_args(argv[:1])
+
+    module_name, func_name, _ = COMMANDS[args.command]
+    func = getattr(importlib.import_module(module_name), func_name)
+    sys.argv[0] = f"pjm {args.command}"
+    try:
+        func(argv[1:])
+    finally:
+        from ingestion.config import settings
+
+        if settings.metrics_report_path and args.command != "serve":
+            from pipeline.metrics import write_run_report
+
+            write_run_report(settings.metrics_report_path)
@@ -1,85 +1,246 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 
-from ingestion.config import PROCESSED_DIR
-from feature_repo.feature_definitions import build_features
-from serving.model_loader import get_model
+from feature_repo.alignment import ALIGNED_COLUMNS, align_sources
+from feature_repo.feature_definitions import FEATURE_LOOKBACK, build_features
+from ingestion.config import PROCESSED_DIR, settings
+from ingestion.schema import enforce_processed_schema
+from ingestion.storage import processed_files_from_s3, trailing_files
+from pipeline import metrics
+from serving.model_loader import get_model, get_model_horizons, is_model_loaded
 
 
-app = FastAPI(title="PJM LMP Forecasting API")
+_features: Optional[pd.DataFrame] = None
+_features_key: Optional[tuple] = None
+_features_checked_at: float = 0.0
+_features_lock = threading.Lock()
+_startup_error: Optional[str] = None
+
+
+def warm_up() -> None:
+    """Load the model and feature snapshot; failures are reported by /ready."""
+    global _startup_error
+    try:
+        get_model()
+        get_latest_features()
+        _startup_error = None
+    except Exception as e:
+        _startup_error = f"{type(e).__name__}: {e}"
+        print(f"Serving warm-up failed: {_startup_error}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the process answers /health (liveness)
+    # immediately while /ready reports 503 until the model and features load.
+    asyncio.get_running_loop().run_in_executor(None, warm_up)
+    yield
+
+
+class MetricsMiddleware:
+    """Count requests and time them per route (plain ASGI, so no body buffering)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.is_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Unknown paths share one label to bound series cardinality
+            path = scope["path"] if scope["path"] in _ROUTE_PATHS else "other"
+            metrics.inc("pjm_http_requests_total", path=path, status=status)
+            metrics.observe("pjm_http_request_duration_seconds", time.perf_counter() - start, path=path)
+
+
+app = FastAPI(title="PJM LMP Forecasting API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 
 class PredictionRequest(BaseModel):
     timestamp_utc: datetime | None = None
+    # Defaults to PJM_NODE_ID
+    node_id: int | None = None
+
+
+class HorizonPrediction(BaseModel):
+    horizon: str
+    target_time_utc: datetime
+    predicted_lmp: float
 
 
 class PredictionResponse(BaseModel):
     timestamp_utc: datetime
+    node_id: int
+    # Shortest horizon (or the single output of a pre multi-horizon model)
     predicted_lmp: float
+    predictions: List[HorizonPrediction] = []
     features_used: List[str]
 
 
-def load_latest_features() -> pd.DataFrame:
-    files = sorted(PROCESSED_DIR.glob("pjm_processed_*.parquet"))
+def _latest_processed_files() -> List[Path]:
+    """Newest processed files covering FEATURE_LOOKBACK, oldest first.
+
+    Pipeline chunks are often a day long, so a single file can't produce
+    the 168h lag; the snapshot is built from enough trailing files.
+    """
+    files = trailing_files(sorted(PROCESSED_DIR.glob("pjm_processed_*.parquet")), FEATURE_LOOKBACK)
+    if not files and settings.use_s3:
+        files = processed_files_from_s3(lookback=FEATURE_LOOKBACK)
     if not files:
         raise RuntimeError("No processed files found for serving.")
-    df = pd.read_parquet(files[-1])
-    df["interval_start_utc"] = pd.to_datetime(df["interval_start_utc"], utc=True)
-    df = df[df["source"] == "rt_lmp"]
+    return files
+
+
+def load_latest_features(paths: List[Path] | None = None) -> pd.DataFrame:
+    paths = paths or _latest_processed_files()
+    df = pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+    df = enforce_processed_schema(df)
+    df = align_sources(df)
 
     df_feat = build_features(df)
     return df_feat
 
 
+def get_latest_features() -> pd.DataFrame:
+    """Feature snapshot of the newest processed files.
+
+    The snapshot is rebuilt only when those files change (including a new
+    chunk arriving), and the check runs at most every
+    FEATURE_REFRESH_SECONDS.
+    """
+    global _features, _features_key, _features_checked_at
+    if _features is not None and time.monotonic() - _features_checked_at < settings.feature_refresh_seconds:
+        return _features
+    with metrics.stage("serving_feature_load"), _features_lock:
+        if _features is not None and time.monotonic() - _features_checked_at < settings.feature_refresh_seconds:
+            return _features
+        try:
+            paths = _latest_processed_files()
+            key = tuple((str(p), p.stat().st_mtime_ns) for p in paths)
+            if _features is None or key != _features_key:
+                _features = load_latest_features(paths)
+                _features_key = key
+                metrics.inc("pjm_serving_feature_reloads_total")
+                metrics.set_gauge("pjm_serving_feature_rows", len(_features))
+        except Exception as e:
+            if _features is None:
+                raise
+            print(f"Keeping previous feature snapshot: {e}")
+        _features_checked_at = time.monotonic()
+        return _features
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
- 
+@app.get("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+def ready():
+    if is_model_loaded() and _features is not None:
+        files = [path for path, _ in _features_key]
+        return {"status": "ready", "features_files": files, "rows": len(_features)}
+    raise HTTPException(status_code=503, detail=_startup_error or "warming up")
 
 
 @app.post("/predict", response_model=PredictionResponse)
 def predict(req: PredictionRequest):
-    model = get_model()
-    df = load_latest_features()
-
-    if req.timestamp_utc:
-        ts = req.timestamp_utc.astimezone(timezone.utc)
-        ts = ts.replace(second=0, microsecond=0)
-        ts = ts - timedelta(minutes=ts.minute % 5)
-        row = df[df["interval_start_utc"] == ts]
-        if row.empty:
-            nearest_idx = (df["interval_start_utc"] - ts).abs().idxmin()
-            nearest_row = df.loc[[nearest_idx]]
-            if (nearest_row["interval_start_utc"].iloc[0] - ts).abs() <= timedelta(minutes=10):
-                row = nearest_row
-            else:
-                row = df.sort_values("interval_start_utc").tail(1)
-    else:
-        row = df.sort_values("interval_start_utc").tail(1)
-
-    exclude = [
-        "interval_start_utc",
-        "node_id",
-        "node_name",
-        "source",
-        "total_lmp",
-    ]
-    features = [c for c in row.columns if c not in exclude]
-    X = row[features].apply(pd.to_numeric, errors="coerce").fillna(0.0)
-
-    y_pred = model.predict(X)[0]
+    try:
+        model = get_model()
+        df = get_latest_features()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    node_id = req.node_id if req.node_id is not None else settings.pjm_node_id
+    with metrics.stage("serving_row_lookup"):
+        # Snapshots hold every node in the processed files; the row (and the
+        # nearest-timestamp fallback) must come from the requested one.
+        df = df[df["node_id"] == node_id]
+        if df.empty:
+            row = None
+        elif req.timestamp_utc:
+            ts = req.timestamp_utc.astimezone(timezone.utc)
+            ts = ts.replace(second=0, microsecond=0)
+            ts = ts - timedelta(minutes=ts.minute % 5)
+            row = df[df["interval_start_utc"] == ts]
+            if row.empty:
+                nearest_idx = (df["interval_start_utc"] - ts).abs().idxmin()
+                nearest_row = df.loc[[nearest_idx]]
+                if (nearest_row["interval_start_utc"].iloc[0] - ts).abs() <= timedelta(minutes=10):
+                    row = nearest_row
+                else:
+                    row = df.sort_values("interval_start_utc").tail(1)
+        else:
+            row = df.sort_values("interval_start_utc").tail(1)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"No features for node {node_id}")
+
+    # Use the model's own feature list so a snapshot with different columns
+    # (e.g. sparser exogenous coverage) can't reorder or drop inputs.
+    features = model.get_booster().feature_names
+    if not features:
+        from training.train_xgb import get_feature_columns
+
+        features = get_feature_columns(row)
+    # Exogenous sources may legitimately be absent (NaN is what the model saw
+    # in training); a missing lag or rolling column means the snapshot is too
+    # short and the prediction would be garbage.
+    missing = [c for c in features if c not in row.columns and c not in ALIGNED_COLUMNS]
+    if missing:
+        raise HTTPException(status_code=503, detail=f"Feature snapshot is missing model features: {missing}")
+    X = row.reindex(columns=features).apply(pd.to_numeric, errors="coerce").astype(np.float32)
+
+    # One predict call returns every horizon of a multi-output model
+    with metrics.stage("serving_predict"):
+        y_pred = np.ravel(model.predict(X)[0])
     ts_out = row["interval_start_utc"].iloc[0].to_pydatetime()
 
+    horizons = get_model_horizons(model)
+    predictions = [
+        HorizonPrediction(
+            horizon=h,
+            target_time_utc=ts_out + pd.Timedelta(h).to_pytimedelta(),
+            predicted_lmp=float(value),
+        )
+        for h, value in zip(horizons, y_pred)
+    ]
+
     return PredictionResponse(
         timestamp_utc=ts_out,
-        predicted_lmp=float(y_pred),
+        node_id=node_id,
+        predicted_lmp=float(y_pred[0]),
+        predictions=predictions,
         features_used=features,
     )
+
+
+_ROUTE_PATHS = frozenset(getattr(route, "path", None) for route in app.routes)
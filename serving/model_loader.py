@@ -1,19 +1,40 @@
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from xgboost import XGBRegressor
+from ingestion.config import settings
 
+if TYPE_CHECKING:
+    from xgboost import XGBRegressor
 
-_model: Optional[XGBRegressor] = None
 
+MODEL_PATH = Path(settings.model_path)
 
-def get_model() -> XGBRegressor:
+_model: Optional["XGBRegressor"] = None
+
+
+def get_model() -> "XGBRegressor":
     global _model
     if _model is None:
-        model_path = Path("data/models/xgb_rt_lmp.json")
+        # Imported here so the API module loads without xgboost.
+        from xgboost import XGBRegressor
+
+        model_path = MODEL_PATH
         if not model_path.exists():
             raise RuntimeError(f"Model file not found at {model_path}")
         model = XGBRegressor()
         model.load_model(model_path)
         _model = model
     return _model
+
+
+def get_model_horizons(model: "XGBRegressor") -> List[str]:
+    """Horizons of a multi-horizon model, in output order.
+
+    Empty for models trained before multi-horizon support (single output).
+    """
+    attr = model.get_booster().attr("horizons")
+    return attr.split(",") if attr else []
+
+
+def is_model_loaded() -> bool:
+    return _model is not None
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from feature_repo.alignment import ALIGNED_COLUMNS, align_sources
+from ingestion.schema import enforce_processed_schema
+
+
+def sample_long_df():
+    ts = pd.date_range("2025-01-01", periods=24, freq="5min", tz="UTC")
+    rt = pd.DataFrame(
+        {
+            "interval_start_utc": np.tile(ts, 2),
+            "node_id": np.repeat([51217, 51288], 24),
+            "total_lmp": np.arange(48, dtype=float),
+            "source": "rt_lmp",
+        }
+    )
+    da = pd.DataFrame(
+        {
+            "interval_start_utc": pd.to_datetime(["2025-01-01 00:00", "2025-01-01 01:00"] * 2, utc=True),
+            "node_id": [51217, 51217, 51288, 51288],
+            "total_lmp": [100.0, 101.0, 200.0, 201.0],
+            "source": "da_lmp",
+        }
+    )
+    load_forecast = pd.DataFrame(
+        {
+            "interval_start_utc": pd.to_datetime(["2025-01-01 01:00", "2025-01-01 01:00"], utc=True),
+            "forecast_time_utc": pd.to_datetime(["2024-12-31 12:00", "2025-01-01 01:30"], utc=True),
+            "load_forecast": [1000.0, 1100.0],
+            "source": "load_forecast",
+        }
+    )
+    load_metered = pd.DataFrame(
+        {
+            "interval_start_utc": pd.to_datetime(["2024-12-31 23:00", "2025-01-01 00:00"], utc=True),
+            "load": [50.0, 60.0],
+            "source": "load_metered",
+        }
+    )
+    return enforce_processed_schema(pd.concat([rt, da, load_forecast, load_metered], ignore_index=True))
+
+
+def _at(df, node_id, ts):
+    return df[(df["node_id"] == node_id) & (df["interval_start_utc"] == pd.Timestamp(ts, tz="UTC"))].iloc[0]
+
+
+def test_align_sources_shape_and_dtypes():
+    out = align_sources(sample_long_df())
+    assert len(out) == 48
+    assert (out["source"] == "rt_lmp").all()
+    for col in ALIGNED_COLUMNS:
+        assert out[col].dtype == "float32"
+
+
+def test_da_price_joined_per_node():
+    out = align_sources(sample_long_df())
+    assert _at(out, 51217, "2025-01-01 00:55")["da_lmp"] == 100.0
+    assert _at(out, 51288, "2025-01-01 00:55")["da_lmp"] == 200.0
+    assert _at(out, 51288, "2025-01-01 01:00")["da_lmp"] == 201.0
+
+
+def test_load_forecast_uses_vintage_known_at_interval():
+    out = align_sources(sample_long_df())
+    # Before the 01:30 revision is published only the older vintage is visible.
+    assert _at(out, 51217, "2025-01-01 01:25")["load_forecast"] == 1000.0
+    assert _at(out, 51217, "2025-01-01 01:30")["load_forecast"] == 1100.0
+    assert np.isnan(_at(out, 51217, "2025-01-01 00:30")["load_forecast"])
+
+
+def test_metered_load_is_lagged():
+    out = align_sources(sample_long_df())
+    assert _at(out, 51217, "2025-01-01 00:55")["load_metered"] == 50.0
+    assert _at(out, 51217, "2025-01-01 01:00")["load_metered"] == 60.0
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from benchmarks.run import compare, run_scale
+from pipeline.synthetic import SyntheticConfig, generate_raw_frame
+
+
+def test_generate_raw_frame_is_deterministic_with_gaps_and_spikes():
+    config = SyntheticConfig(nodes=3, days=2, gap_ratio=0.05, spike_ratio=0.01, seed=7)
+    a = generate_raw_frame(config)
+    b = generate_raw_frame(config)
+    pd.testing.assert_frame_equal(a, b)
+
+    rt = a[a["source"] == "rt_lmp"]
+    assert rt["Location"].nunique() == 3
+    # 3 nodes x 2 days of 5-min intervals, minus dropped gaps
+    assert len(rt) < 3 * 2 * 288
+    assert rt["LMP"].max() > 4 * rt["LMP"].median()
+
+    forecast = a[a["source"] == "load_forecast"]
+    assert forecast.groupby("Interval Start")["Publish Time"].nunique().eq(2).all()
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {
+        "results": [
+            {"scale": "s", "stage": "etl", "seconds": 1.0, "peak_mb": 10.0},
+            {"scale": "s", "stage": "tiny", "seconds": 0.001, "peak_mb": None},
+        ]
+    }
+    current = {
+        "results": [
+            {"scale": "s", "stage": "etl", "seconds": 1.5, "peak_mb": 10.5},
+            {"scale": "s", "stage": "tiny", "seconds": 0.002, "peak_mb": None},
+            {"scale": "s", "stage": "new", "seconds": 9.0, "peak_mb": None},
+        ]
+    }
+    regressions = compare(current, baseline, threshold=0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("s/etl")
+
+    assert compare(current, baseline, threshold=0.6) == []
+
+
+def test_run_scale_smoke():
+    stages = ["process_raw_file", "load_processed_data", "align_sources", "build_features"]
+    results = run_scale("tiny", nodes=1, days=9, stages=stages, repeat=1, memory=True)
+    assert [r["stage"] for r in results] == stages
+    assert all(r["seconds"] > 0 and r["peak_mb"] is not None for r in results)
+    assert results[-1]["rows"] > 0
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _loaded_modules(code: str) -> set:
+    out = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(out.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "module, heavy",
+    [
+        ("pjm.cli", {"mlflow", "great_expectations", "xgboost", "pandas"}),
+        ("training.train_xgb", {"mlflow", "xgboost", "great_expectations"}),
+        ("ingestion.validate_data", {"great_expectations", "mlflow"}),
+        ("ingestion.fetch_pjm_data", {"gridstatus", "mlflow"}),
+        ("serving.main", {"xgboost", "mlflow", "great_expectations"}),
+    ],
+)
+def test_heavy_imports_are_deferred(module, heavy):
+    loaded = _loaded_modules(f"import {module}")
+    assert not heavy & loaded
+
+
+def test_cli_help_lists_subcommands():
+    out = subprocess.run(
+        [sys.executable, "-m", "pjm", "--help"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    for cmd in ["fetch", "etl", "validate", "train", "pipeline", "serve", "bench", "loadtest"]:
+        assert cmd in out
@@ -4,7 +4,9 @@ from feature_repo.feature_definitions import (
     add_lag_features,
     add_rolling_features,
     add_cyclical_time_features,
+    add_horizon_targets,
     build_features,
+    parse_horizons,
 )
 
 
@@ -52,3 +54,83 @@ def test_build_features():
     assert df2.shape[0] < df.shape[0]
     assert "hour_sin" in df2.columns
     assert "lmp_lag_24h" in df2.columns
+
+
+def test_build_features_keeps_float32():
+    df = sample_df()
+    df["total_lmp"] = df["total_lmp"].astype("float32")
+    df2 = build_features(df)
+    for col in ["lmp_lag_1h", "lmp_rolling_mean_24h", "lmp_rolling_std_24h", "hour_sin"]:
+        assert df2[col].dtype == "float32"
+
+
+def test_lag_features_per_node():
+    a = sample_df()
+    b = sample_df()
+    b["node_id"] = 51288
+    b["total_lmp"] = b["total_lmp"] + 1000
+    df2 = build_features(pd.concat([a, b], ignore_index=True))
+    for node_id, group in df2.groupby("node_id"):
+        offset = 1000 if node_id == 51288 else 0
+        assert (group["lmp_lag_1h"] >= offset).all()
+        assert (group["lmp_rolling_mean_24h"] >= offset).all()
+
+
+def test_horizon_targets_per_node_with_gaps():
+    ts = pd.date_range("2025-01-01", periods=300, freq="5min", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "interval_start_utc": list(ts) * 2,
+            "node_id": [1] * 300 + [2] * 300,
+            "total_lmp": list(range(300)) + list(range(1000, 1300)),
+        }
+    ).astype({"total_lmp": "float32"})
+    # Drop node 1's 00:25 interval and shuffle rows
+    df = df.drop(index=[5]).sample(frac=1, random_state=0)
+
+    out = add_horizon_targets(df, parse_horizons(["5m", "1h", "24h"])).sort_values(
+        ["node_id", "interval_start_utc"]
+    )
+    node1 = out[out["node_id"] == 1].set_index("interval_start_utc")
+    node2 = out[out["node_id"] == 2].set_index("interval_start_utc")
+
+    assert node1.loc[ts[0], "target_lmp_5m"] == 1
+    assert node1.loc[ts[0], "target_lmp_1h"] == 12
+    assert node1.loc[ts[0], "target_lmp_24h"] == 288
+    # The gap yields NaN, not the next available interval
+    assert pd.isna(node1.loc[ts[4], "target_lmp_5m"])
+    # Targets never cross into another node
+    assert node2.loc[ts[0], "target_lmp_1h"] == 1012
+    assert node1["target_lmp_24h"].notna().sum() == 11
+    assert out["target_lmp_5m"].dtype == "float32"
+
+
+def test_build_features_keeps_empty_aligned_columns():
+    from feature_repo.alignment import ALIGNED_COLUMNS, align_sources
+
+    # RT rows only: no DA price, load forecast or metered load to align
+    out = build_features(align_sources(sample_df()))
+    assert set(ALIGNED_COLUMNS) <= set(out.columns)
+    assert len(out) > 0
+
+
+def test_build_features_keeps_rows_with_partial_exogenous_coverage():
+    from feature_repo.alignment import align_sources
+
+    # A load forecast that only covers the last hour, like a historical
+    # window fetched together with today's forecast
+    rt = sample_df()
+    last_hour = rt["interval_start_utc"].iloc[-12:]
+    forecast = pd.DataFrame(
+        {
+            "interval_start_utc": last_hour,
+            "forecast_time_utc": last_hour.iloc[0] - pd.Timedelta("1h"),
+            "load_forecast": 90000.0,
+            "source": "load_forecast",
+        }
+    )
+    rt_only = build_features(align_sources(rt))
+    out = build_features(align_sources(pd.concat([rt, forecast], ignore_index=True)))
+
+    assert len(out) == len(rt_only)
+    assert 0 < out["load_forecast"].notna().sum() <= 12
@@ -1,5 +1,8 @@
 from pathlib import Path
 
+import pandas as pd
+import pytest
+
 from ingestion.config import RAW_DIR, PROCESSED_DIR
 from ingestion.etl_pipeline import process_raw_file
 
@@ -24,3 +27,73 @@ def test_process_raw_file_smoke():
         "source",
     }
     assert expected.issubset(df_cols)
+
+
+def _raw_lmp_frame(n: int = 24) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Interval Start": pd.date_range("2025-01-01", periods=n, freq="5min", tz="US/Eastern"),
+            "Location": 51217,
+            "Location Name": "SomeNode",
+            "LMP": [30.0 + i for i in range(n - 1)] + [99999.0],
+            "Congestion": 0.5,
+            "Loss": 0.1,
+            "source": "rt_lmp",
+        }
+    )
+
+
+def test_process_raw_file_enforces_schema(tmp_path, monkeypatch):
+    import ingestion.etl_pipeline as etl
+    from ingestion.schema import PROCESSED_COLUMNS, PROCESSED_DTYPES
+
+    monkeypatch.setattr(etl, "PROCESSED_DIR", tmp_path)
+    raw_path = tmp_path / "pjm_raw_20250101_20250102.parquet"
+    _raw_lmp_frame().to_parquet(raw_path, index=False)
+
+    out_path = etl.process_raw_file(raw_path, report_sizes=True)
+    df = pd.read_parquet(out_path)
+
+    assert list(df.columns) == PROCESSED_COLUMNS
+    assert {c: str(t) for c, t in df.dtypes.items()} == PROCESSED_DTYPES
+    assert df["total_lmp"].max() == 5000
+    assert df["load"].isna().all()
+
+
+@pytest.mark.parametrize("codec", ["snappy", "gzip", "none", "uncompressed"])
+def test_write_processed_parquet_with_other_codecs(tmp_path, monkeypatch, codec):
+    import pyarrow.parquet as pq
+
+    from ingestion.config import settings
+    from ingestion.schema import enforce_processed_schema, write_processed_parquet
+
+    # PARQUET_COMPRESSION_LEVEL keeps its zstd-oriented default of 3
+    monkeypatch.setattr(settings, "parquet_compression", codec)
+    df = enforce_processed_schema(
+        pd.DataFrame(
+            {
+                "interval_start_utc": pd.date_range("2025-01-01", periods=24, freq="5min", tz="UTC"),
+                "node_id": 51217,
+                "total_lmp": 30.0,
+                "source": "rt_lmp",
+            }
+        )
+    )
+    path = tmp_path / "out.parquet"
+    write_processed_parquet(df, path)
+
+    expected = "UNCOMPRESSED" if codec in ("none", "uncompressed") else codec.upper()
+    assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == expected
+    assert len(pd.read_parquet(path)) == len(df)
+
+
+def test_enforce_processed_schema_after_concat():
+    from ingestion.schema import enforce_processed_schema
+
+    a = enforce_processed_schema(_raw_lmp_frame().rename(columns={"Location Name": "node_name"}))
+    b = a.copy()
+    b["node_name"] = b["node_name"].cat.rename_categories(["OtherNode"])
+    df = enforce_processed_schema(pd.concat([a, b], ignore_index=True))
+
+    assert isinstance(df["node_name"].dtype, pd.CategoricalDtype)
+    assert set(df["node_name"].cat.categories) == {"SomeNode", "OtherNode"}
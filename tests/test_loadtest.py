@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.loadtest import Endpoint, RequestRecord, parse_endpoint, run_loadtest, summarize
+
+
+def test_parse_endpoint():
+    assert parse_endpoint("/predict") == Endpoint("POST", "/predict")
+    assert parse_endpoint("get:/ready") == Endpoint("GET", "/ready")
+    with pytest.raises(ValueError):
+        parse_endpoint("GET:ready")
+
+
+def test_summarize_percentiles_and_errors():
+    records = [RequestRecord("POST /predict", "200", True, (i + 1) / 1000) for i in range(99)]
+    records.append(RequestRecord("POST /predict", "503", False, 1.0))
+    report = summarize(records, elapsed=2.0)
+    assert report["requests"] == 100
+    assert report["error_rate"] == 0.01
+    assert report["throughput_rps"] == 50.0
+    assert report["latency_ms"]["p50"] == pytest.approx(50.5)
+    assert report["latency_ms"]["max"] == 1000.0
+    assert report["status_counts"] == {"200": 99, "503": 1}
+
+
+def test_inprocess_loadtest_smoke():
+    report = run_loadtest(
+        target="inprocess",
+        endpoints=[Endpoint("POST", "/predict"), Endpoint("GET", "/health")],
+        concurrency=4,
+        duration=None,
+        requests=24,
+        days=9,
+        nodes=1,
+    )
+    assert report["requests"] == 24
+    assert report["errors"] == 0
+    assert set(report["endpoints"]) == {"POST /predict", "GET /health"}
+    assert report["latency_ms"]["p99"] >= report["latency_ms"]["p50"] > 0
+    assert report["server"]["rss_mb_max"] > 0
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from pipeline import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    metrics.configure(enabled=True, trace_memory=False)
+    yield
+    metrics.reset()
+    metrics.configure(enabled=True, trace_memory=False)
+
+
+def test_stage_timings_and_failures_render_as_prometheus():
+    @metrics.timed("etl")
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 1
+
+    work()
+    work()
+    with pytest.raises(ValueError):
+        work(fail=True)
+    metrics.record_rows("etl", 10)
+
+    text = metrics.render_prometheus()
+    assert "# TYPE pjm_stage_duration_seconds histogram" in text
+    assert 'pjm_stage_duration_seconds_count{stage="etl"} 3' in text
+    assert 'pjm_stage_duration_seconds_bucket{stage="etl",le="+Inf"} 3' in text
+    assert 'pjm_stage_failures_total{stage="etl"} 1.0' in text
+    assert 'pjm_stage_rows_total{stage="etl"} 10.0' in text
+
+    report = json.loads(json.dumps(metrics.run_report()))
+    assert report["stages"]["etl"]["calls"] == 3
+    assert report["stages"]["etl"]["failures"] == 1
+
+
+def test_disabled_records_nothing():
+    metrics.configure(enabled=False)
+    with metrics.stage("fit"):
+        pass
+    metrics.inc("pjm_stage_rows_total", 5, stage="fit")
+    assert metrics.run_report()["stages"] == {}
+    assert "pjm_stage" not in metrics.render_prometheus()
+
+
+def test_nested_stage_memory_includes_inner_peak():
+    metrics.configure(trace_memory=True)
+    with metrics.stage("outer"):
+        with metrics.stage("inner"):
+            blob = bytearray(8 * 1024 * 1024)
+            del blob
+    stages = metrics.run_report()["stages"]
+    assert stages["inner"]["peak_memory_bytes"] >= 8 * 1024 * 1024
+    assert stages["outer"]["peak_memory_bytes"] >= stages["inner"]["peak_memory_bytes"]
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from pipeline.runner import PipelineRunner, Stage, build_pipeline
+from pipeline.stub_client import StubPJM
+
+
+def _write_stage(name, src, dst, calls, deps=()):
+    def func():
+        calls.append(name)
+        dst.write_text(src.read_text().upper())
+
+    return Stage(
+        name=name,
+        func=func,
+        deps=list(deps),
+        inputs=[src],
+        outputs=[dst],
+        code=["pipeline.runner"],
+    )
+
+
+def test_runner_skips_unchanged_stages(tmp_path):
+    src = tmp_path / "a.txt"
+    mid = tmp_path / "b.txt"
+    out = tmp_path / "c.txt"
+    src.write_text("x")
+    calls = []
+    stages = [
+        _write_stage("first", src, mid, calls),
+        _write_stage("second", mid, out, calls, deps=["first"]),
+    ]
+    cache = tmp_path / "cache.json"
+
+    results = PipelineRunner(stages, cache_path=cache).run()
+    assert [r.status for r in results] == ["ran", "ran"]
+
+    results = PipelineRunner(stages, cache_path=cache).run()
+    assert [r.status for r in results] == ["cached", "cached"]
+    assert calls == ["first", "second"]
+
+    src.write_text("y")
+    results = PipelineRunner(stages, cache_path=cache).run()
+    assert [r.status for r in results] == ["ran", "ran"]
+
+    out.write_text("tampered")
+    results = PipelineRunner(stages, cache_path=cache).run()
+    assert [r.status for r in results] == ["cached", "ran"]
+
+
+def test_runner_blocks_dependents_of_failed_stage(tmp_path):
+    def boom():
+        raise SystemExit("Data validation failed")
+
+    ran = []
+    stages = [
+        Stage(name="a", func=boom),
+        Stage(name="b", func=lambda: ran.append("b"), deps=["a"]),
+        Stage(name="c", func=lambda: ran.append("c")),
+    ]
+    results = PipelineRunner(stages, cache_path=tmp_path / "cache.json").run()
+    assert [r.status for r in results] == ["failed", "blocked", "ran"]
+    assert "Data validation failed" in results[0].error
+    assert ran == ["c"]
+
+
+def test_offline_fetch_and_etl(tmp_path, monkeypatch):
+    import ingestion.etl_pipeline as etl
+    import ingestion.fetch_pjm_data as fetch
+
+    monkeypatch.setattr(fetch, "RAW_DIR", tmp_path / "raw")
+    monkeypatch.setattr(etl, "PROCESSED_DIR", tmp_path / "processed")
+    (tmp_path / "raw").mkdir()
+    (tmp_path / "processed").mkdir()
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 1, 3, tzinfo=timezone.utc)
+    stages = build_pipeline(start, end, client=StubPJM(), validate=False, train=False)
+    assert [s.name for s in stages] == [
+        "fetch_20250101_20250102",
+        "etl_20250101_20250102",
+        "fetch_20250102_20250103",
+        "etl_20250102_20250103",
+    ]
+
+    cache = tmp_path / "cache.json"
+    results = PipelineRunner(stages, cache_path=cache).run()
+    assert all(r.status == "ran" for r in results)
+    df = pd.read_parquet(stages[1].outputs[0])
+    assert set(df["source"].unique()) == {"rt_lmp", "da_lmp", "load_forecast", "load_metered"}
+    assert results[1].rows == len(df)
+
+    results = PipelineRunner(stages, cache_path=cache).run()
+    assert all(r.status == "cached" for r in results)
+
+
+def test_offline_pipeline_validates_chunks_with_multiple_workers(tmp_path, monkeypatch):
+    import ingestion.etl_pipeline as etl
+    import ingestion.fetch_pjm_data as fetch
+
+    monkeypatch.setattr(fetch, "RAW_DIR", tmp_path / "raw")
+    monkeypatch.setattr(etl, "PROCESSED_DIR", tmp_path / "processed")
+    (tmp_path / "raw").mkdir()
+    (tmp_path / "processed").mkdir()
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 1, 4, tzinfo=timezone.utc)
+    stages = build_pipeline(start, end, client=StubPJM(), validate=True, train=False)
+    results = PipelineRunner(stages, cache_path=tmp_path / "cache.json", workers=4).run()
+
+    validated = [r for r in results if r.name.startswith("validate_")]
+    assert len(validated) == 3
+    assert all(r.status == "ran" for r in results), [(r.name, r.error) for r in results]
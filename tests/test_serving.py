@@ -0,0 +1,205 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import serving.main as serving_main
+import serving.model_loader as model_loader
+from feature_repo.alignment import align_sources
+from feature_repo.feature_definitions import build_features
+from ingestion.schema import enforce_processed_schema, write_processed_parquet
+from training.train_xgb import DEFAULT_HORIZONS, add_targets, get_feature_columns, get_params
+
+
+@pytest.fixture
+def serving_env(tmp_path, monkeypatch):
+    from xgboost import XGBRegressor
+
+    n = 12 * 24 * 9
+    ts = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    df = enforce_processed_schema(
+        pd.DataFrame(
+            {
+                "interval_start_utc": ts,
+                "node_id": 51217,
+                "node_name": "SomeNode",
+                "total_lmp": 30 + 10 * np.sin(np.arange(n) / 12),
+                "source": "rt_lmp",
+            }
+        )
+    )
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    write_processed_parquet(df, processed / "pjm_processed_20250101_20250110.parquet")
+
+    feats, targets = add_targets(build_features(align_sources(df)), list(DEFAULT_HORIZONS))
+    cols = get_feature_columns(feats)
+    params = get_params(test_run=True, multi_output=True) | {"n_estimators": 5, "max_depth": 2}
+    model = XGBRegressor(**params)
+    model.fit(feats[cols].astype(np.float32), feats[targets])
+    model.get_booster().set_attr(horizons=",".join(DEFAULT_HORIZONS))
+    model_path = tmp_path / "model.json"
+    model.save_model(model_path)
+
+    monkeypatch.setattr(model_loader, "MODEL_PATH", model_path)
+    monkeypatch.setattr(model_loader, "_model", None)
+    monkeypatch.setattr(serving_main, "PROCESSED_DIR", processed)
+    monkeypatch.setattr(serving_main, "_features", None)
+    monkeypatch.setattr(serving_main, "_features_key", None)
+    monkeypatch.setattr(serving_main, "_startup_error", None)
+    return tmp_path
+
+
+def _wait_ready(client, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resp = client.get("/ready")
+        if resp.status_code == 200:
+            return resp
+        time.sleep(0.05)
+    return resp
+
+
+def test_lifespan_warms_up_model_and_features(serving_env):
+    with TestClient(serving_main.app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+        resp = _wait_ready(client)
+        assert resp.status_code == 200
+        assert resp.json()["rows"] > 0
+
+        pred = client.post("/predict", json={})
+        assert pred.status_code == 200
+        body = pred.json()
+        assert "lmp_lag_1h" in body["features_used"]
+        assert not any(f.startswith("target_") for f in body["features_used"])
+        assert [p["horizon"] for p in body["predictions"]] == list(DEFAULT_HORIZONS)
+        assert body["predicted_lmp"] == body["predictions"][0]["predicted_lmp"]
+        ts = pd.Timestamp(body["timestamp_utc"])
+        assert pd.Timestamp(body["predictions"][-1]["target_time_utc"]) == ts + pd.Timedelta("24h")
+
+
+def test_ready_reports_startup_failure(serving_env, monkeypatch):
+    monkeypatch.setattr(model_loader, "MODEL_PATH", serving_env / "missing.json")
+    with TestClient(serving_main.app) as client:
+        assert client.get("/health").status_code == 200
+        time.sleep(0.2)
+        resp = client.get("/ready")
+        assert resp.status_code == 503
+        assert client.post("/predict", json={}).status_code == 503
+
+
+def test_metrics_endpoint_exports_serving_steps(serving_env):
+    with TestClient(serving_main.app) as client:
+        assert _wait_ready(client).status_code == 200
+        assert client.post("/predict", json={}).status_code == 200
+        resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    for stage in ["serving_feature_load", "serving_row_lookup", "serving_predict"]:
+        assert f'pjm_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'pjm_http_requests_total{path="/predict",status="200"}' in text
+
+
+def test_predict_when_serving_file_has_more_exogenous_coverage(serving_env):
+    # The model was trained on RT-only data; the newest file also carries a
+    # load forecast for its last day, as the live fetcher produces.
+    processed = serving_env / "processed"
+    rt = pd.read_parquet(processed / "pjm_processed_20250101_20250110.parquet")
+    last_day = pd.date_range("2025-01-09", periods=24, freq="1h", tz="UTC")
+    forecast = pd.DataFrame(
+        {
+            "interval_start_utc": last_day,
+            "forecast_time_utc": pd.Timestamp("2025-01-08 12:00", tz="UTC"),
+            "load_forecast": 90000.0,
+            "source": "load_forecast",
+        }
+    )
+    df = enforce_processed_schema(pd.concat([rt, forecast], ignore_index=True))
+    write_processed_parquet(df, processed / "pjm_processed_20250101_20250111.parquet")
+
+    with TestClient(serving_main.app) as client:
+        assert _wait_ready(client).status_code == 200
+        assert "load_forecast" in serving_main._features.columns
+        resp = client.post("/predict", json={})
+
+    assert resp.status_code == 200
+    model = model_loader.get_model()
+    assert resp.json()["features_used"] == model.get_booster().feature_names
+
+
+def test_predict_rejects_snapshot_missing_lag_features(serving_env):
+    # Two days of history can't produce the 168h lag the model was trained on
+    processed = serving_env / "processed"
+    path = processed / "pjm_processed_20250101_20250110.parquet"
+    rt = pd.read_parquet(path)
+    path.unlink()
+    short = rt[rt["interval_start_utc"] >= pd.Timestamp("2025-01-08", tz="UTC")]
+    write_processed_parquet(short, processed / "pjm_processed_20250108_20250110.parquet")
+
+    with TestClient(serving_main.app) as client:
+        assert _wait_ready(client).status_code == 200
+        resp = client.post("/predict", json={})
+
+    assert resp.status_code == 503
+    assert "lmp_lag_168h" in resp.json()["detail"]
+
+
+def test_snapshot_spans_daily_chunks_and_reloads_on_new_chunk(serving_env, monkeypatch):
+    # The pipeline writes one file per day; lags need a week of history
+    processed = serving_env / "processed"
+    path = processed / "pjm_processed_20250101_20250110.parquet"
+    rt = pd.read_parquet(path)
+    path.unlink()
+    next_day = rt.tail(288).assign(interval_start_utc=lambda d: d["interval_start_utc"] + pd.Timedelta("1D"))
+    rt = pd.concat([rt, next_day], ignore_index=True)
+    day = rt["interval_start_utc"].dt.floor("D")
+    for start in pd.date_range("2025-01-01", "2025-01-09", freq="D", tz="UTC"):
+        end = start + pd.Timedelta("1D")
+        write_processed_parquet(rt[day == start], processed / f"pjm_processed_{start:%Y%m%d}_{end:%Y%m%d}.parquet")
+
+    with TestClient(serving_main.app) as client:
+        ready = _wait_ready(client)
+        assert ready.status_code == 200
+        assert len(ready.json()["features_files"]) == 8
+        resp = client.post("/predict", json={})
+        assert resp.status_code == 200
+        assert resp.json()["timestamp_utc"].startswith("2025-01-09T23:55")
+
+        write_processed_parquet(
+            rt[day == pd.Timestamp("2025-01-10", tz="UTC")],
+            processed / "pjm_processed_20250110_20250111.parquet",
+        )
+        monkeypatch.setattr(serving_main, "_features_checked_at", 0.0)
+        resp = client.post("/predict", json={})
+
+    assert resp.status_code == 200
+    assert resp.json()["timestamp_utc"].startswith("2025-01-10T23:55")
+    assert serving_main._features_key[-1][0].endswith("pjm_processed_20250110_20250111.parquet")
+
+
+def test_predict_uses_requested_node(serving_env):
+    # A second node whose data stops a day earlier
+    processed = serving_env / "processed"
+    path = processed / "pjm_processed_20250101_20250110.parquet"
+    a = pd.read_parquet(path)
+    b = a[a["interval_start_utc"] < pd.Timestamp("2025-01-09", tz="UTC")].assign(node_id=51288)
+    b["total_lmp"] += 1000
+    write_processed_parquet(enforce_processed_schema(pd.concat([a, b], ignore_index=True)), path)
+
+    with TestClient(serving_main.app) as client:
+        assert _wait_ready(client).status_code == 200
+        default = client.post("/predict", json={})
+        other = client.post("/predict", json={"node_id": 51288})
+        unknown = client.post("/predict", json={"node_id": 1})
+
+    assert default.status_code == 200
+    assert default.json()["node_id"] == 51217
+    assert default.json()["timestamp_utc"].startswith("2025-01-09T23:55")
+    assert other.status_code == 200
+    assert other.json()["node_id"] == 51288
+    assert other.json()["timestamp_utc"].startswith("2025-01-08T23:55")
+    assert unknown.status_code == 404
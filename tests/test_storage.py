@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from ingestion.storage import S3Storage, trailing_files
+
+moto = pytest.importorskip("moto")
+
+
+BUCKET = "pjm-test-processed"
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        s = S3Storage(
+            region="us-east-1",
+            max_concurrency=4,
+            multipart_chunksize=5 * 1024 * 1024,
+            cache_dir=tmp_path / "cache",
+            cache_max_bytes=10 * 1024 * 1024,
+        )
+        s.client.create_bucket(Bucket=BUCKET)
+        yield s
+
+
+def _parquet(tmp_path, name, n=1000, row_group_size=250):
+    df = pd.DataFrame({"i": range(n), "v": [float(i) * 0.5 for i in range(n)]})
+    path = tmp_path / name
+    df.to_parquet(path, index=False, row_group_size=row_group_size)
+    return path, df
+
+
+def test_upload_and_ranged_row_group_read(storage, tmp_path):
+    path, df = _parquet(tmp_path, "a.parquet")
+    uris = storage.upload_files([(path, BUCKET, "processed/a.parquet")])
+    assert uris == [f"s3://{BUCKET}/processed/a.parquet"]
+
+    part = storage.read_parquet(BUCKET, "processed/a.parquet", columns=["v"], row_groups=[2])
+    assert list(part.columns) == ["v"]
+    assert part["v"].tolist() == df["v"].iloc[500:750].tolist()
+
+    full = storage.read_parquet(BUCKET, "processed/a.parquet")
+    pd.testing.assert_frame_equal(full, df)
+
+
+def test_multipart_upload_round_trip(storage, tmp_path):
+    path = tmp_path / "big.bin"
+    path.write_bytes(bytes(range(256)) * (12 * 1024 * 1024 // 256))
+    storage.upload_file(path, BUCKET, "raw/big.bin")
+    etag = storage.client.head_object(Bucket=BUCKET, Key="raw/big.bin")["ETag"]
+    assert etag.strip('"').endswith("-3")  # 3 parts of 5MB
+
+    dest = storage.download_file(BUCKET, "raw/big.bin", tmp_path / "out" / "big.bin")
+    assert dest.read_bytes() == path.read_bytes()
+
+
+def test_read_through_cache_keyed_by_etag(storage, tmp_path):
+    path, _ = _parquet(tmp_path, "a.parquet")
+    storage.upload_file(path, BUCKET, "processed/a.parquet")
+
+    first = storage.cached_path(BUCKET, "processed/a.parquet")
+    assert first.exists()
+    assert storage.cached_path(BUCKET, "processed/a.parquet") == first
+
+    path, df = _parquet(tmp_path, "a.parquet", n=10)
+    storage.upload_file(path, BUCKET, "processed/a.parquet")
+    second = storage.cached_path(BUCKET, "processed/a.parquet")
+    assert second != first
+    assert not first.exists()
+    pd.testing.assert_frame_equal(pd.read_parquet(second), df)
+
+
+def test_cache_is_size_bounded(storage, tmp_path):
+    storage.cache.max_bytes = 3000
+    for i in range(5):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(b"x" * 1000)
+        storage.upload_file(path, BUCKET, f"raw/{i}.bin")
+    paths = storage.cached_paths(BUCKET, [f"raw/{i}.bin" for i in range(5)])
+    assert paths[-1].exists()
+    assert storage.cache.size_bytes() <= 3000
+
+
+def test_trailing_files_cover_lookback():
+    keys = [
+        "processed/pjm_processed_20250101_20250102.parquet",
+        "processed/pjm_processed_20250102_20250103.parquet",
+        "processed/pjm_processed_20250103_20250104.parquet",
+        "processed/pjm_processed_20250104_20250105.parquet",
+        "processed/pjm_processed_20250104_20250106.parquet",
+    ]
+    # The 0104-0105 chunk lies inside the newer 0104-0106 one
+    assert trailing_files(keys, timedelta(days=3)) == [keys[2], keys[4]]
+    assert trailing_files(keys, timedelta(days=30)) == [keys[0], keys[1], keys[2], keys[4]]
+    assert trailing_files(["processed/pjm_processed_loadtest.parquet"], timedelta(days=8)) == [
+        "processed/pjm_processed_loadtest.parquet"
+    ]
@@ -34,3 +34,37 @@ def test_training_smoke():
     train_model(test_run=True, limit_files=1)
     model_path = Path("data/models/xgb_rt_lmp.json")
     assert model_path.exists()
+
+
+def test_split_xy_multi_target():
+    from training.train_xgb import split_xy
+
+    df = pd.DataFrame(
+        {
+            "interval_start_utc": pd.date_range("2025-01-01", periods=10, tz="UTC"),
+            "f1": range(10),
+            "target_lmp_5m": range(10),
+            "target_lmp_1h": range(10, 20),
+        }
+    )
+    features = get_feature_columns(df)
+    assert features == ["f1"]
+    X_train, y_train, X_test, y_test = split_xy(df, features, ["target_lmp_5m", "target_lmp_1h"])
+    assert y_train.shape == (8, 2)
+    assert list(y_test.columns) == ["target_lmp_5m", "target_lmp_1h"]
+    assert (y_train.dtypes == "float32").all()
+
+
+def test_split_xy_keeps_missing_features_as_nan():
+    from training.train_xgb import split_xy
+
+    df = pd.DataFrame(
+        {
+            "interval_start_utc": pd.date_range("2025-01-01", periods=10, tz="UTC"),
+            "total_lmp": range(10),
+            "load_forecast": [None] * 5 + [90000.0] * 5,
+        }
+    )
+    X_train, _, X_test, _ = split_xy(df, ["load_forecast"])
+    assert X_train["load_forecast"].isna().sum() == 5
+    assert (X_test["load_forecast"] == 90000.0).all()
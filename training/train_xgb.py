@@ -2,22 +2,35 @@ import argparse
 from pathlib import Path
 from typing import List
 
-import mlflow
-import mlflow.xgboost
-from mlflow.models import infer_signature
 import numpy as np
 import pandas as pd
-from xgboost import XGBRegressor
 
 from ingestion.config import PROCESSED_DIR, settings
-from feature_repo.feature_definitions import build_features
+from ingestion.schema import enforce_processed_schema
+from ingestion.storage import processed_files_from_s3
+from feature_repo.alignment import align_sources
+from feature_repo.feature_definitions import (
+    DEFAULT_HORIZONS,
+    add_horizon_targets,
+    build_features,
+    parse_horizons,
+    target_column,
+)
+from pipeline.metrics import record_rows, timed
 
 
 TARGET_COLUMN = "total_lmp"
+MODEL_PATH = Path(settings.model_path)
 
 
-def load_processed_data(limit_files: int | None = None) -> pd.DataFrame:
-    files = sorted(PROCESSED_DIR.glob("pjm_processed_*.parquet"))
+@timed("load_data")
+def load_processed_data(
+    limit_files: int | None = None, files: List[Path] | None = None
+) -> pd.DataFrame:
+    if files is None:
+        files = sorted(PROCESSED_DIR.glob("pjm_processed_*.parquet"))
+        if not files and settings.use_s3:
+            files = processed_files_from_s3(limit_files=limit_files)
     if not files:
         raise FileNotFoundError("No processed files found in data/processed")
 
@@ -26,8 +39,9 @@ def load_processed_data(limit_files: int | None = None) -> pd.DataFrame:
 
     dfs = [pd.read_parquet(f) for f in files]
     df = pd.concat(dfs, ignore_index=True)
-    df["interval_start_utc"] = pd.to_datetime(df["interval_start_utc"], utc=True)
-    return df
+    record_rows("load_data", len(df))
+    # Categories differ per file, so concat falls back to object; re-apply.
+    return enforce_processed_schema(df)
 
 
 def train_test_split_time(df: pd.DataFrame, test_ratio: float = 0.2):
@@ -46,72 +60,132 @@ def get_feature_columns(df: pd.DataFrame) -> List[str]:
         "source",
         TARGET_COLUMN,
     ]
-    return [c for c in df.columns if c not in exclude]
+    return [c for c in df.columns if c not in exclude and not c.startswith("target_")]
+
+
+def split_xy(df: pd.DataFrame, features: List[str], targets: List[str] | None = None):
+    """Time-ordered train/test split as float32 X/y frames.
+
+    With `targets`, y is a frame with one column per target (multi-output);
+    otherwise it is the TARGET_COLUMN series.
+    """
+    train_df, test_df = train_test_split_time(df)
+    X_train = train_df[features].apply(pd.to_numeric, errors="coerce")
+    X_test = test_df[features].apply(pd.to_numeric, errors="coerce")
+    if targets:
+        # add_targets already dropped rows without every horizon's target
+        y_train = train_df[targets].apply(pd.to_numeric, errors="coerce")
+        y_test = test_df[targets].apply(pd.to_numeric, errors="coerce")
+    else:
+        y_train = pd.to_numeric(train_df[TARGET_COLUMN], errors="coerce")
+        y_test = pd.to_numeric(test_df[TARGET_COLUMN], errors="coerce")
+        if y_train.isna().any() or y_test.isna().any():
+            y_train = y_train.fillna(method="ffill").fillna(method="bfill")
+            y_test = y_test.fillna(method="ffill").fillna(method="bfill")
+
+    # Missing features (e.g. a load forecast that wasn't published) stay NaN;
+    # XGBoost learns a default branch for them, whereas 0 would read as 0 MW.
+    X_train = X_train.astype(np.float32)
+    X_test = X_test.astype(np.float32)
+    y_train = y_train.astype(np.float32)
+    y_test = y_test.astype(np.float32)
+    return X_train, y_train, X_test, y_test
+
+
+def get_params(test_run: bool = False, multi_output: bool = False) -> dict:
+    params = {
+        "learning_rate": 0.05,
+        "max_depth": 6,
+        "subsample": 0.8,
+        "colsample_bytree": 0.8,
+        "n_estimators": 500,
+        "objective": "reg:squarederror",
+        "tree_method": "hist",
+    }
+
+    if multi_output:
+        # One tree per round with a vector leaf covering every horizon,
+        # instead of one model (and one predict call) per horizon.
+        params["multi_strategy"] = "multi_output_tree"
+
+    if test_run:
+        params["n_estimators"] = 50
+    return params
+
+
+@timed("fit")
+def fit_model(X_train, y_train, X_test, y_test, params: dict):
+    from xgboost import XGBRegressor
+
+    record_rows("fit", len(X_train))
+    model = XGBRegressor(**params)
+    model.fit(
+        X_train,
+        y_train,
+        eval_set=[(X_test, y_test)],
+        verbose=False,
+    )
+    return model
+
+
+def add_targets(df: pd.DataFrame, horizons: List[str]):
+    """Add one target per horizon and drop rows missing any of them.
+
+    Returns the frame and the target column names, in horizon order.
+    """
+    df = add_horizon_targets(df, parse_horizons(horizons))
+    targets = [target_column(h) for h in horizons]
+    return df.dropna(subset=targets), targets
+
+
+def train_model(
+    test_run: bool = False,
+    limit_files: int | None = None,
+    files: List[Path] | None = None,
+    horizons: List[str] | None = None,
+) -> Path:
+    horizons = list(horizons or DEFAULT_HORIZONS)
 
+    # mlflow takes seconds to import; only pay for it when training.
+    import mlflow
+    import mlflow.xgboost
+    from mlflow.models import infer_signature
 
-def train_model(test_run: bool = False, limit_files: int | None = None) -> None:
     mlflow.set_tracking_uri("file:./mlruns")
     mlflow.set_experiment("pjm_lmp_xgboost")
 
     with mlflow.start_run():
-        df = load_processed_data(limit_files=limit_files)
-        df = df[df["source"] == "rt_lmp"]
+        df = load_processed_data(limit_files=limit_files, files=files)
+        df = align_sources(df)
         df = build_features(df)
+        df, targets = add_targets(df, horizons)
         if df.empty or len(df) < 100:
             raise SystemExit("Not enough rows after feature engineering. Increase data window.")
 
         features = get_feature_columns(df)
-        X = df[features].apply(pd.to_numeric, errors="coerce")
-        y = pd.to_numeric(df[TARGET_COLUMN], errors="coerce")
-
-        train_df, test_df = train_test_split_time(df)
-        X_train = train_df[features].apply(pd.to_numeric, errors="coerce")
-        y_train = pd.to_numeric(train_df[TARGET_COLUMN], errors="coerce")
-        X_test = test_df[features].apply(pd.to_numeric, errors="coerce")
-        y_test = pd.to_numeric(test_df[TARGET_COLUMN], errors="coerce")
-        if X_train.isna().any().any() or y_train.isna().any() or X_test.isna().any().any() or y_test.isna().any():
-            X_train = X_train.fillna(0.0)
-            X_test = X_test.fillna(0.0)
-            y_train = y_train.fillna(method="ffill").fillna(method="bfill")
-            y_test = y_test.fillna(method="ffill").fillna(method="bfill")
-
-        X_train = X_train.astype(np.float64)
-        X_test = X_test.astype(np.float64)
-        y_train = y_train.astype(np.float64)
-        y_test = y_test.astype(np.float64)
-
-        params = {
-            "learning_rate": 0.05,
-            "max_depth": 6,
-            "subsample": 0.8,
-            "colsample_bytree": 0.8,
-            "n_estimators": 500,
-            "objective": "reg:squarederror",
-            "tree_method": "hist",
-        }
-
-        if test_run:
-            params["n_estimators"] = 50
+        X_train, y_train, X_test, y_test = split_xy(df, features, targets)
+        params = get_params(test_run, multi_output=len(targets) > 1)
 
         mlflow.log_params(params)
+        mlflow.log_param("horizons", ",".join(horizons))
 
-        model = XGBRegressor(**params)
-        model.fit(
-            X_train,
-            y_train,
-            eval_set=[(X_test, y_test)],
-            verbose=False,
-        )
+        model = fit_model(X_train, y_train, X_test, y_test, params)
+        # Serving reads the output order back from the saved model
+        model.get_booster().set_attr(horizons=",".join(horizons))
 
-        y_pred = model.predict(X_test)
-        rmse = float(np.sqrt(np.mean((y_pred - y_test) ** 2)))
-        mae = float(np.mean(np.abs(y_pred - y_test)))
+        y_pred = model.predict(X_test).reshape(len(X_test), -1)
+        errors = y_pred - y_test.to_numpy()
+        rmse = float(np.sqrt(np.mean(errors**2)))
+        mae = float(np.mean(np.abs(errors)))
 
         mlflow.log_metric("rmse", rmse)
         mlflow.log_metric("mae", mae)
+        for i, horizon in enumerate(horizons):
+            mlflow.log_metric(f"rmse_{horizon}", float(np.sqrt(np.mean(errors[:, i] ** 2))))
+            mlflow.log_metric(f"mae_{horizon}", float(np.mean(np.abs(errors[:, i]))))
 
         # Placeholder Sharpe ratio: use simple return-like metric
-        returns = y_test.values - y_pred
+        returns = -errors
         if returns.std() > 0:
             sharpe = float(returns.mean() / returns.std())
             mlflow.log_metric("sharpe_like", sharpe)
@@ -122,29 +196,41 @@ def train_model(test_run: bool = False, limit_files: int | None = None) -> None:
             artifact_path="model",
             registered_model_name="pjm_lmp_xgb_model",
             signature=signature,
-            input_example=X_test.head(1).astype(np.float64),
+            input_example=X_test.head(1),
         )
 
-        out_path = Path("data/models/xgb_rt_lmp.json")
+        out_path = MODEL_PATH
         out_path.parent.mkdir(parents=True, exist_ok=True)
         model.save_model(out_path)
         print(f"Model saved to {out_path}")
         print(f"RMSE={rmse:.3f}, MAE={mae:.3f}")
+        return out_path
 
 
-def main() -> None:
+def main(argv: List[str] | None = None) -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--test-run",
         action="store_true",
         help="Train quickly on a small subset",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--horizons",
+        type=str,
+        default=",".join(DEFAULT_HORIZONS),
+        help="Comma separated forecast horizons, e.g. 5m,1h,4h,24h",
+    )
+    args = parser.parse_args(argv)
+    horizons = [h for h in args.horizons.split(",") if h]
+    try:
+        parse_horizons(horizons)
+    except ValueError as e:
+        raise SystemExit(f"Invalid --horizons: {e}")
 
     if args.test_run:
-        train_model(test_run=True, limit_files=1)
+        train_model(test_run=True, limit_files=1, horizons=horizons)
     else:
-        train_model(test_run=False, limit_files=None)
+        train_model(test_run=False, limit_files=None, horizons=horizons)
 
 
 if __name__ == "__main__":